@@ -0,0 +1,32 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that keeps the session's User in the cache.
+
+    AuthenticationMiddleware calls get_user() on every request; with the user
+    cached that lookup no longer hits the database. Entries are dropped when
+    the User is saved or deleted (see accounts.signals), but only from the
+    saving process's cache; settings.AUTH_USER_CACHE_SECONDS bounds how long
+    other workers may serve a stale User.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_SECONDS)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        # ModelBackend's async version would skip the cache
+        return await sync_to_async(self.get_user)(user_id)
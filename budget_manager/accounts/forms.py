@@ -2,10 +2,14 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 
+from budgets.currency import CURRENCY_CHOICES, DEFAULT_CURRENCY
+from .models import Profile
+
 class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(required=True)
     first_name = forms.CharField(max_length=100, required=False)
     last_name = forms.CharField(max_length=100, required=False)
+    base_currency = forms.ChoiceField(choices=CURRENCY_CHOICES, initial=DEFAULT_CURRENCY, required=False)
     
     class Meta:
         model = User
@@ -18,6 +22,10 @@ class CustomUserCreationForm(UserCreationForm):
         user.last_name = self.cleaned_data.get('last_name', '')
         if commit:
             user.save()
+            Profile.objects.create(
+                user=user,
+                base_currency=self.cleaned_data.get('base_currency') or DEFAULT_CURRENCY,
+            )
         return user
 
 
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 with the iteration count taken from settings.PASSWORD_HASH_ITERATIONS.
+
+    Shares the ``pbkdf2_sha256`` algorithm name with Django's hasher, so existing
+    hashes keep verifying and are re-encoded at the new work factor on next login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,81 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = "Benchmark password hashing cost, login throughput and per-request auth queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=10, help='Login POSTs to time (default 10)')
+        parser.add_argument(
+            '--iterations', type=int, nargs='*', default=[],
+            help='Extra PBKDF2 iteration counts to compare against the configured one',
+        )
+
+    def handle(self, *args, **options):
+        hasher = get_hasher('default')
+        self.stdout.write(f"Session engine: {settings.SESSION_ENGINE}")
+        self.stdout.write(f"Configured hasher: {hasher.algorithm} x {hasher.iterations} iterations")
+
+        self.stdout.write(f"\n{'iterations':>12}{'ms/hash':>10}{'hashes/s/core':>16}")
+        for iterations in sorted({hasher.iterations, *options['iterations']}):
+            hasher_ms = self.time_hash(hasher, iterations)
+            self.stdout.write(f"{iterations:>12}{hasher_ms:>10.1f}{1000 / hasher_ms:>16.1f}")
+
+        username = f'bench-{uuid.uuid4().hex[:8]}'
+        password = uuid.uuid4().hex
+        user = User.objects.create_user(username, password=password)
+        try:
+            with override_settings(LOGIN_RATE_LIMITS={}):
+                self.bench_logins(username, password, options['logins'])
+            self.count_auth_queries(user)
+        finally:
+            user.delete()
+
+    def time_hash(self, hasher, iterations, rounds=3):
+        salt = hasher.salt()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            hasher.encode('benchmark-password', salt, iterations)
+        return (time.perf_counter() - start) * 1000 / rounds
+
+    def bench_logins(self, username, password, count):
+        url = reverse('accounts:login')
+        timings = []
+        for _ in range(max(1, count)):
+            client = Client(HTTP_HOST='localhost')
+            start = time.perf_counter()
+            response = client.post(url, {'username': username, 'password': password})
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 302:
+                self.stderr.write(f"Login returned {response.status_code}")
+                return
+        avg = sum(timings) / len(timings)
+        self.stdout.write(
+            f"\nLogin POST: avg {avg:.1f} ms, min {min(timings):.1f} ms, "
+            f"{1000 / avg:.1f} logins/s on one worker"
+        )
+
+    def count_auth_queries(self, user):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+        url = reverse('dashboard')
+        client.get(url)  # warm the session and user caches
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        auth_queries = [
+            q for q in queries
+            if 'django_session' in q['sql'] or 'FROM "auth_user"' in q['sql']
+        ]
+        self.stdout.write(
+            f"Dashboard request: {len(queries)} queries, {len(auth_queries)} for session/user"
+        )
@@ -0,0 +1,111 @@
+import logging
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = "Measure dashboard latency while other clients flood the login endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attackers', type=int, default=4, help='Concurrent flooding threads (default 4)')
+        parser.add_argument(
+            '--rate', type=float, default=10.0,
+            help='Login attempts per second sent by each attacker (default 10)',
+        )
+        parser.add_argument('--ips', type=int, default=1, help='Distinct source IPs used by the flood (default 1)')
+        parser.add_argument('--requests', type=int, default=30, help='Dashboard requests per phase (default 30)')
+        parser.add_argument(
+            '--warmup', type=float, default=10.0,
+            help='Seconds of flooding before measuring, so burst allowances are used up (default 10)',
+        )
+        parser.add_argument('--no-limit', action='store_true', help='Disable login rate limiting for comparison')
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(f'flood-{uuid.uuid4().hex[:8]}', password=uuid.uuid4().hex)
+        try:
+            if options['no_limit']:
+                with override_settings(LOGIN_RATE_LIMITS={}):
+                    self.run_phases(user, options)
+            else:
+                self.run_phases(user, options)
+        finally:
+            user.delete()
+
+    def run_phases(self, user, options):
+        # Every rejected attempt would otherwise log a "Too Many Requests" warning.
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        viewer = Client(HTTP_HOST='localhost')
+        viewer.force_login(user)
+        dashboard = reverse('dashboard')
+        viewer.get(dashboard)
+
+        baseline = self.time_requests(viewer, dashboard, options['requests'])
+
+        stop = threading.Event()
+        results = {'sent': 0, 'limited': 0}
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=self.flood,
+                args=(i % max(1, options['ips']), options['rate'], stop, results, lock),
+            )
+            for i in range(options['attackers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['warmup'])
+        try:
+            flooded = self.time_requests(viewer, dashboard, options['requests'])
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(f"Rate limiting: {'off' if options['no_limit'] else 'on'}")
+        self.stdout.write(f"Login flood: {results['sent']} attempts, {results['limited']} answered 429")
+        self.report('Dashboard (idle)', baseline)
+        self.report('Dashboard (flood)', flooded)
+
+    def flood(self, ip_index, rate, stop, results, lock):
+        # Open-loop sender: attempts go out on a fixed schedule whether or not
+        # the server keeps up, like a remote attacker would.
+        client = Client(HTTP_HOST='localhost', REMOTE_ADDR=f'10.0.0.{ip_index + 1}')
+        url = reverse('accounts:login')
+        interval = 1 / rate
+        next_send = time.perf_counter()
+        try:
+            while not stop.is_set():
+                next_send += interval
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    stop.wait(delay)
+                response = client.post(url, {'username': f'victim{uuid.uuid4().hex[:6]}', 'password': 'guess'})
+                with lock:
+                    results['sent'] += 1
+                    results['limited'] += response.status_code == 429
+        finally:
+            connection.close()
+
+    def time_requests(self, client, url, count):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f"{label:<20} p50 {statistics.median(timings):7.1f} ms   p95 {p95:7.1f} ms"
+        )
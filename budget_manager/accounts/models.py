@@ -1,3 +1,19 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+from budgets.currency import CURRENCY_CHOICES, DEFAULT_CURRENCY
+
+
+class Profile(models.Model):
+    """Per-user preferences"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
+    base_currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
+
+    def __str__(self):
+        return f"{self.user.username} ({self.base_currency})"
+
+    @classmethod
+    def base_currency_for(cls, user):
+        """Currency reports are shown in; users without a profile get the default."""
+        currency = cls.objects.filter(user=user).values_list('base_currency', flat=True).first()
+        return currency or DEFAULT_CURRENCY
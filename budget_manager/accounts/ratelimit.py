@@ -0,0 +1,145 @@
+"""Token-bucket rate limiting for the login and register endpoints.
+
+Each limited key (client IP, username) owns a bucket holding up to ``burst``
+tokens that refills continuously at ``burst / period`` tokens per second.
+An attempt spends one token; an empty bucket means the request is rejected
+with 429 before any password hashing happens.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+
+class LocalBucketStore:
+    """Buckets kept in this process; each worker limits independently.
+
+    Buckets are grouped by period, least recently used first, so the ones that
+    have refilled completely (untouched for a whole period) sit at the front
+    of their group and pruning never scans live buckets.
+    """
+
+    prune_every = 1000
+
+    def __init__(self):
+        self._buckets = {}  # period -> OrderedDict(key -> (tokens, stamp))
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def take(self, key, burst, period, now=None):
+        """Spend a token for ``key``. Returns seconds to wait, or 0 if allowed."""
+        now = time.monotonic() if now is None else now
+        rate = burst / period
+        with self._lock:
+            buckets = self._buckets.setdefault(period, OrderedDict())
+            tokens, stamp = buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            self._calls += 1
+            if self._calls % self.prune_every == 0:
+                self._prune(now)
+            if tokens < 1:
+                buckets[key] = (tokens, now)
+                return (1 - tokens) / rate
+            buckets[key] = (tokens - 1, now)
+            return 0
+
+    def _prune(self, now):
+        # A bucket untouched for its whole period is full again; forget it.
+        for period, buckets in self._buckets.items():
+            while buckets:
+                key, (_, stamp) = next(iter(buckets.items()))
+                if now - stamp < period:
+                    break
+                del buckets[key]
+
+    def __len__(self):
+        return sum(len(buckets) for buckets in self._buckets.values())
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """Buckets kept in a Django cache so all workers share the same limits.
+
+    The read-modify-write is not atomic, so concurrent attempts may slip a
+    token or two past the limit; that is fine for throttling floods.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def take(self, key, burst, period, now=None):
+        now = time.time() if now is None else now
+        rate = burst / period
+        cache_key = f'ratelimit:{key}'
+        tokens, stamp = self.cache.get(cache_key, (burst, now))
+        tokens = min(burst, tokens + (now - stamp) * rate)
+        if tokens < 1:
+            self.cache.set(cache_key, (tokens, now), period)
+            return (1 - tokens) / rate
+        self.cache.set(cache_key, (tokens - 1, now), period)
+        return 0
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    return import_string(settings.RATE_LIMIT_STORE)()
+
+
+@receiver(setting_changed)
+def reset_bucket_store(setting, **kwargs):
+    if setting in ('RATE_LIMIT_STORE', 'LOGIN_RATE_LIMITS', 'REGISTER_RATE_LIMITS'):
+        get_bucket_store.cache_clear()
+
+
+def client_ip(request):
+    if getattr(settings, 'RATE_LIMIT_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse(
+        'Too many attempts. Please wait a moment and try again.',
+        status=429,
+        content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def rate_limit_post(limits_setting):
+    """Apply the limits named by ``limits_setting`` to POST requests.
+
+    The setting maps a key kind ('ip' or 'username') to ``(burst, period)``.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if request.method == 'POST':
+                store = get_bucket_store()
+                limits = getattr(settings, limits_setting, {})
+                keys = {'ip': client_ip(request)}
+                username = request.POST.get('username', '').strip().lower()
+                if username:
+                    keys['username'] = username
+                for kind, (burst, period) in limits.items():
+                    if kind not in keys:
+                        continue
+                    wait = store.take(f'{limits_setting}:{kind}:{keys[kind]}', burst, period)
+                    if wait:
+                        return too_many_requests(wait)
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorator
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from budgets.models import DataVersion
+
+from .backends import user_cache_key
+from .models import Profile
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=Profile)
+def bump_data_version_on_currency_change(sender, instance, **kwargs):
+    # Report pages are rendered in the base currency, so their ETags must change too
+    DataVersion.bump(instance.user_id)
@@ -1,3 +1,95 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from .ratelimit import LocalBucketStore, get_bucket_store
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        self.user = User.objects.create_user('bob', password='secret-pass-1')
+
+    def test_login_redirects_to_dashboard(self):
+        response = self.client.post('/accounts/login/', {'username': 'bob', 'password': 'secret-pass-1'})
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.user.pk)
+
+    def test_session_user_is_cached(self):
+        self.client.force_login(self.user)
+        self.client.get('/dashboard/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/accounts/csrf-test/')
+            self.assertEqual(response.wsgi_request.user.pk, self.user.pk)
+
+    def test_cached_user_dropped_on_save(self):
+        self.client.force_login(self.user)
+        self.client.get('/dashboard/')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(AUTH_USER_CACHE_SECONDS=5)
+    def test_cached_user_expires_for_other_workers(self):
+        # Another worker's save can't reach this process's cache; the entry must age out
+        from django.core.cache import cache
+
+        from .backends import user_cache_key
+
+        self.client.force_login(self.user)
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            cache.delete(user_cache_key(self.user.pk))
+            self.client.get('/dashboard/')
+        cache_set.assert_any_call(user_cache_key(self.user.pk), mock.ANY, 5)
+
+
+class TokenBucketTests(TestCase):
+    def test_burst_then_refill(self):
+        store = LocalBucketStore()
+        self.assertEqual([store.take('k', 3, 3, now=0) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(store.take('k', 3, 3, now=0), 1.0)
+        self.assertEqual(store.take('k', 3, 3, now=1.0), 0)
+        self.assertGreater(store.take('k', 3, 3, now=1.0), 0)
+
+    def test_full_buckets_are_pruned_by_their_period(self):
+        store = LocalBucketStore()
+        store.prune_every = 3
+        store.take('short', 5, 60, now=0)
+        store.take('long', 5, 600, now=0)
+        # Third call prunes: 'short' has refilled after 60 s, 'long' has not
+        store.take('new', 5, 60, now=100)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(list(store._buckets[600]), ['long'])
+
+
+@override_settings(LOGIN_RATE_LIMITS={'ip': (3, 60), 'username': (2, 60)})
+class LoginRateLimitTests(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        User.objects.create_user('carol', password='secret-pass-1')
+
+    def attempt(self, username, ip='10.1.1.1'):
+        return self.client.post(
+            '/accounts/login/', {'username': username, 'password': 'wrong'}, REMOTE_ADDR=ip,
+        )
+
+    def test_username_limit_rejects_before_hashing(self):
+        self.assertEqual(self.attempt('carol').status_code, 200)
+        self.assertEqual(self.attempt('Carol', ip='10.1.1.2').status_code, 200)
+        with mock.patch('django.contrib.auth.hashers.PBKDF2PasswordHasher.encode') as encode:
+            response = self.attempt('carol', ip='10.1.1.3')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        encode.assert_not_called()
+
+    def test_ip_limit(self):
+        for name in ('a', 'b', 'c'):
+            self.assertEqual(self.attempt(name).status_code, 200)
+        self.assertEqual(self.attempt('d').status_code, 429)
+        self.assertEqual(self.attempt('d', ip='10.1.1.9').status_code, 200)
+
+    def test_get_is_not_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get('/accounts/login/').status_code, 200)
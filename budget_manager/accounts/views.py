@@ -1,13 +1,15 @@
 from django.shortcuts import render, redirect
-from django.contrib.auth import login, authenticate, logout
+from django.contrib.auth import login, logout
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.middleware.csrf import get_token
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .forms import CustomUserCreationForm, CustomLoginForm
+from .ratelimit import rate_limit_post
 
 @ensure_csrf_cookie
+@rate_limit_post('REGISTER_RATE_LIMITS')
 def register_view(request):
     if request.user.is_authenticated:
         return redirect('dashboard')
@@ -28,6 +30,7 @@ def register_view(request):
     return render(request, 'accounts/register.html', {'form' : form})
 
 @ensure_csrf_cookie
+@rate_limit_post('LOGIN_RATE_LIMITS')
 def login_view(request):
     if request.user.is_authenticated:
         return redirect('dashboard')
@@ -35,9 +38,9 @@ def login_view(request):
     if request.method == 'POST':
         form = CustomLoginForm(request, data=request.POST)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
+            # The form already authenticated the credentials; reuse that user
+            # rather than paying for a second password hash.
+            user = form.get_user()
 
             if user is not None:
                 login(request, user)
@@ -3,6 +3,10 @@ ASGI config for budget_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Live dashboard updates (/live/) are long-lived server-sent event streams and
+only work under ASGI, e.g. ``uvicorn budget_manager.asgi:application``. Their
+pub/sub is in-process, so one worker process serves all of a user's devices.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,79 @@
+"""Read-replica routing for report and list views (see settings.DATABASE_ROUTERS).
+
+Only code running inside ``replica_reads`` (the ``reads_from_replica``
+decorator on budgets views) reads from ``settings.REPLICA_DATABASE``;
+everything else, and every write, goes to ``default``. After a user writes,
+their reads stay on the primary for ``REPLICA_STICKY_SECONDS`` so they never
+see a page that is missing what they just saved.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# Apps whose tables are replicated and safe to read slightly stale. Sessions,
+# auth and profiles stay on the primary: a lagging session row logs users out.
+REPLICA_APP_LABELS = {'budgets'}
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_alias():
+    return getattr(settings, 'REPLICA_DATABASE', None)
+
+
+def recent_write_key(user_id):
+    return f'db-recent-write:{user_id}'
+
+
+def record_write(user_id):
+    """Pin the user's reads to the primary until the replica has caught up."""
+    if replica_alias():
+        cache.set(recent_write_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def wrote_recently(user_id):
+    return cache.get(recent_write_key(user_id), False)
+
+
+@contextmanager
+def replica_reads(user_id):
+    """Route reads of replicated apps to the replica unless the user just wrote."""
+    token = _use_replica.set(bool(replica_alias()) and not wrote_recently(user_id))
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def reads_from_replica(view_func):
+    """View decorator: read-only pages may be served from the replica."""
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        with replica_reads(request.user.pk):
+            return view_func(request, *args, **kwargs)
+    return _wrapped
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and model._meta.app_label in REPLICA_APP_LABELS:
+            return replica_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explicit, so objects read from the replica are still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is populated from the primary, never migrated directly
+        return db == DEFAULT_DB_ALIAS
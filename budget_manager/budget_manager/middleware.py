@@ -0,0 +1,63 @@
+"""Project middleware; most of it is used by the production profile (see settings.MIDDLEWARE)."""
+import re
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_cache_control
+
+from .db_router import record_write
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip only text responses; PDFs and images are already compressed."""
+
+    compressible_types = ('text/html', 'text/css', 'text/javascript', 'application/json', 'application/javascript')
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in self.compressible_types:
+            return response
+        return super().process_response(request, response)
+
+
+class StaticCacheControlMiddleware:
+    """Long-lived Cache-Control for static files when Django serves them itself.
+
+    Files written by ManifestStaticFilesStorage carry a content hash in their
+    name (base.b0009c9c801c.css), so they never change and can be cached for a
+    year. Unhashed names only get a short lifetime.
+    """
+
+    hashed_name = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.static_prefix = '/' + settings.STATIC_URL.lstrip('/')
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.status_code == 200 and request.path.startswith(self.static_prefix):
+            if self.hashed_name.search(request.path):
+                patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+            else:
+                patch_cache_control(response, public=True, max_age=3600)
+        return response
+
+
+class RecentWriteMiddleware:
+    """Keep a user's reads on the primary database right after they write.
+
+    Any unsafe request by a signed-in user counts as a write; see
+    db_router.reads_from_replica for the read side.
+    """
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in self.safe_methods and request.user.is_authenticated:
+            record_write(request.user.pk)
+        return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -23,7 +24,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-*puudsy6n_$3*%0v2i0k^s3=*g8tby5wyi2ag71ti51v=bcj%v'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Set DJANGO_DEBUG=0 to get the production profile (cached templates, hashed static files).
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') != '0'
 
 ALLOWED_HOSTS = []
 
@@ -50,15 +52,28 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'budget_manager.middleware.RecentWriteMiddleware',
 ]
 
+# Production profile: compress text responses, answer conditional GETs with
+# 304 (report views use per-user data-version ETags, everything else gets a
+# content hash) and put long-lived Cache-Control on hashed static files.
+PRODUCTION_MIDDLEWARE = [
+    'budget_manager.middleware.StaticCacheControlMiddleware',
+    'budget_manager.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+]
+
+if not DEBUG:
+    MIDDLEWARE = PRODUCTION_MIDDLEWARE + MIDDLEWARE
+
 ROOT_URLCONF = 'budget_manager.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR, 'templates'],
-        'APP_DIRS': True,
+        'APP_DIRS': DEBUG,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
@@ -70,6 +85,15 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Compile each template once per process instead of re-parsing on every request
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'budget_manager.wsgi.application'
 
 
@@ -80,8 +104,59 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Read replica for report and list views (budget_manager.db_router). Point
+    # DJANGO_REPLICA_DB at a copy kept in sync from the primary (e.g. by
+    # Litestream); without it the alias is never used. Tests mirror default.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DJANGO_REPLICA_DB') or BASE_DIR / 'db.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['budget_manager.db_router.ReplicaRouter']
+REPLICA_DATABASE = 'replica' if os.environ.get('DJANGO_REPLICA_DB') else None
+# Read-your-writes window: longer than the worst expected replication lag.
+# Tracked in the default cache, so use DJANGO_CACHE=file with several workers.
+REPLICA_STICKY_SECONDS = int(os.environ.get('DJANGO_REPLICA_STICKY_SECONDS', 10))
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+
+# PBKDF2 work factor. Each login costs one full hash, so this bounds login
+# throughput per core. `manage.py bench_login` measures it on the target
+# machine; pick the highest value that still meets the login target there.
+# Django's default is 1,000,000; never go below OWASP's 600,000 for SHA-256.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('DJANGO_PASSWORD_HASH_ITERATIONS', 1_000_000))
+
+PASSWORD_HASHERS = [
+    'accounts.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Session user is served from the cache instead of a per-request User query
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+
+# Login/register throttling (accounts.ratelimit), checked before any hashing.
+# Each entry is (burst, period in seconds): up to `burst` attempts at once,
+# refilled at burst/period per second. Over the limit the view answers 429.
+LOGIN_RATE_LIMITS = {
+    'ip': (20, 60),
+    'username': (5, 60),
+}
+REGISTER_RATE_LIMITS = {
+    'ip': (5, 600),
 }
+# LocalBucketStore limits per worker process; CacheBucketStore shares the
+# buckets through the default cache (use with DJANGO_CACHE=file or similar).
+RATE_LIMIT_STORE = os.environ.get('DJANGO_RATE_LIMIT_STORE', 'accounts.ratelimit.LocalBucketStore')
+# Only enable behind a proxy that sets X-Forwarded-For itself.
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = False
 
 
 # Password validation
@@ -114,11 +189,90 @@ USE_I18N = True
 
 USE_TZ = True
 
+# Exchange rates (budgets.ExchangeRate) are stored as the value of one unit in
+# this currency; load them with `manage.py import_exchange_rates rates.csv`.
+EXCHANGE_RATE_PIVOT = 'INR'
+
+# `manage.py archive_transactions` moves incomes and expenses older than this
+# many months into budgets.ArchivedTransaction, keeping monthly rollups.
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('DJANGO_ARCHIVE_AFTER_MONTHS', 24))
+
+# `manage.py prune_sync` drops sync tombstones and idempotency records older
+# than this. Clients whose cursor predates the pruned tombstones are told to
+# resync in full, and must not retry a batch that is older than this.
+SYNC_RETENTION_DAYS = int(os.environ.get('DJANGO_SYNC_RETENTION_DAYS', 90))
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Let Django serve STATIC_ROOT itself when there is no front-end web server
+SERVE_STATIC = os.environ.get('DJANGO_SERVE_STATIC', '0') == '1'
+
+# Outside DEBUG, collectstatic writes content-hashed copies (base.3f2a1c.css) so
+# they can be served with far-future cache headers.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# DJANGO_CACHE=file shares the cache between worker processes on one host.
+SHARED_CACHE = os.environ.get('DJANGO_CACHE', 'locmem') == 'file'
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'budget-manager',
+        }
+    }
+
+# How long accounts.backends.CachedModelBackend serves a session's User from
+# the cache. Saving a User drops the entry only from the cache of the process
+# that saved it, so with the per-process locmem cache other workers keep
+# accepting a deactivated user (or old permissions) for up to this long.
+# Keep it to seconds unless the cache is shared.
+AUTH_USER_CACHE_SECONDS = int(os.environ.get('DJANGO_AUTH_USER_CACHE_SECONDS', 300 if SHARED_CACHE else 5))
+
+# Same trade-off for the exchange-rate table (budgets.currency): an import or
+# admin edit drops only the local copy, so with locmem other workers pick up
+# new rates within this many seconds. A shared cache keeps it until the next edit.
+RATE_TABLE_CACHE_SECONDS = None if SHARED_CACHE else int(os.environ.get('DJANGO_RATE_TABLE_CACHE_SECONDS', 60))
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+
+# db: one session row query per request (Django default)
+# cached_db: cache first, database as fallback (survives cache restarts)
+# signed_cookies: no server-side storage at all
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('DJANGO_SESSION_ENGINE', 'cached_db')]
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -1,5 +1,115 @@
-from django.contrib import admin
-from .models import ExpenseCategory, Income, Expense, Budget
+import json
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import F, Window
+from django.db.models.functions import Lag
+from django.shortcuts import redirect
+from django.urls import path
+from django.utils.functional import cached_property
+
+from .models import (
+    ArchivedTransaction, ChangedMonth, MonthlyRollup, PlatformCategoryMonth, PlatformMonth, ExpenseCategory, ExpenseFlag, ExpenseStats, Income, Expense, ExpenseSplit, ExpenseTag, Budget, ExchangeRate, Household,
+    HouseholdMembership, SavingsGoal, SyncWrite, Tag, Tombstone, TransactionYear,
+)
+
+
+# Below this many rows an exact COUNT(*) is cheap enough to keep
+ESTIMATE_COUNT_ABOVE = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses the planner's row estimate instead of COUNT(*) on big tables
+
+    Unfiltered lists read the table statistics (pg_class on PostgreSQL,
+    sqlite_stat1 after ANALYZE on SQLite); filtered lists on PostgreSQL use
+    the EXPLAIN estimate. Small or unanalysed tables are counted exactly.
+    The last pages of an estimated list may therefore be empty or missing.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is not None and estimate > ESTIMATE_COUNT_ABOVE:
+            return estimate
+        return super().count
+
+    def _estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                if queryset.query.where:
+                    plan = json.loads(queryset.order_by().explain(format='json'))
+                    return int(plan[0]['Plan']['Plan Rows'])
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+            if connection.vendor == 'sqlite' and not queryset.query.where:
+                try:
+                    cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                except DatabaseError:
+                    return None  # never analysed
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+        return None
+
+
+class UserFilter(admin.SimpleListFilter):
+    """Filter by one user picked with the admin autocomplete, instead of listing every user"""
+    title = 'user'
+    parameter_name = 'user'
+    template = 'admin/budgets/user_filter.html'
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if value and value.isdigit():
+            return list(User.objects.filter(pk=value).values_list('pk', 'username'))
+        return []
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(user_id=value)
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            'query_string': changelist.get_query_string(remove=[self.parameter_name, 'p']),
+            'selected': self.lookup_choices[0] if self.lookup_choices else None,
+            'app_label': changelist.model._meta.app_label,
+            'model_name': changelist.model._meta.model_name,
+        }
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables with millions of rows
+
+    No exact counts, no facets and no distinct-date queries; users are
+    picked with UserFilter and the change form's autocomplete.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    autocomplete_fields = ['user']
+
+    @property
+    def media(self):
+        user_field = self.model._meta.get_field('user')
+        return (
+            super().media
+            + AutocompleteSelect(user_field, self.admin_site).media
+            + forms.Media(js=['js/admin_user_filter.js'])
+        )
 
 
 @admin.register(ExpenseCategory)
@@ -9,25 +119,187 @@ class ExpenseCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Income)
-class IncomeAdmin(admin.ModelAdmin):
-    list_display = ['user', 'source', 'amount', 'date', 'created_at']
-    list_filter = ['date', 'user']
+class IncomeAdmin(LargeTableAdmin):
+    list_display = ['user', 'source', 'amount', 'currency', 'date', 'created_at']
+    list_filter = [UserFilter, 'date', 'currency']
+    list_select_related = ['user']
     search_fields = ['source', 'description']
-    date_hierarchy = 'date'
     readonly_fields = ['created_at', 'updated_at']
 
 
+class ExpenseSplitInline(admin.TabularInline):
+    model = ExpenseSplit
+    extra = 0
+
+
+class ExpenseTagInline(admin.TabularInline):
+    model = ExpenseTag
+    extra = 0
+    raw_id_fields = ['tag']
+
+
 @admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
-    list_display = ['user', 'title', 'category', 'amount', 'date', 'created_at']
-    list_filter = ['category', 'date', 'user']
+class ExpenseAdmin(LargeTableAdmin):
+    list_display = ['user', 'title', 'category', 'amount', 'currency', 'is_split', 'date', 'created_at']
+    list_filter = [UserFilter, 'category', 'date', 'currency', 'is_split']
+    list_select_related = ['user', 'category']
     search_fields = ['title', 'description']
-    date_hierarchy = 'date'
+    raw_id_fields = ['household']
     readonly_fields = ['created_at', 'updated_at']
+    inlines = [ExpenseSplitInline, ExpenseTagInline]
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'user']
+    search_fields = ['name', 'user__username']
+    raw_id_fields = ['user']
 
 
 @admin.register(Budget)
-class BudgetAdmin(admin.ModelAdmin):
+class BudgetAdmin(LargeTableAdmin):
     list_display = ['user', 'category', 'amount', 'month', 'year']
-    list_filter = ['category', 'month', 'year', 'user']
+    list_filter = [UserFilter, 'category', 'month', 'year']
+    list_select_related = ['user', 'category']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(SavingsGoal)
+class SavingsGoalAdmin(admin.ModelAdmin):
+    list_display = ['user', 'name', 'target_amount', 'saved_amount', 'currency', 'deadline']
+    search_fields = ['name', 'user__username']
+    raw_id_fields = ['user']
+
+
+class HouseholdMembershipInline(admin.TabularInline):
+    model = HouseholdMembership
+    extra = 0
+    raw_id_fields = ['user']
+
+
+@admin.register(Household)
+class HouseholdAdmin(admin.ModelAdmin):
+    list_display = ['name', 'owner', 'base_currency', 'created_at']
+    search_fields = ['name', 'owner__username']
+    raw_id_fields = ['owner']
+    inlines = [HouseholdMembershipInline]
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ['currency', 'year', 'month', 'rate']
+    list_filter = ['currency', 'year']
+
+
+@admin.register(TransactionYear)
+class TransactionYearAdmin(admin.ModelAdmin):
+    list_display = ['user', 'year', 'first_date', 'last_date']
+    list_filter = ['year']
+    readonly_fields = ['user', 'year', 'first_date', 'last_date']
+
+
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'kind', 'title', 'category', 'amount', 'currency', 'date']
+    list_filter = ['kind', 'currency']
+    search_fields = ['title', 'user__username']
+    raw_id_fields = ['user']
+
+
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'year', 'month', 'kind', 'label', 'currency', 'total', 'count']
+    list_filter = ['kind', 'year']
+    raw_id_fields = ['user']
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ['user', 'kind', 'object_id', 'sync_seq', 'deleted_at']
+    list_filter = ['kind']
+    raw_id_fields = ['user']
+
+
+@admin.register(SyncWrite)
+class SyncWriteAdmin(admin.ModelAdmin):
+    list_display = ['user', 'key', 'created_at']
+    search_fields = ['key', 'user__username']
+    raw_id_fields = ['user']
+    readonly_fields = ['result', 'created_at']
+
+
+@admin.register(ExpenseFlag)
+class ExpenseFlagAdmin(admin.ModelAdmin):
+    list_display = ['user', 'expense', 'kind', 'score', 'dismissed', 'created_at']
+    list_filter = ['kind', 'dismissed']
+    raw_id_fields = ['user', 'expense', 'duplicate_of']
+
+
+@admin.register(ExpenseStats)
+class ExpenseStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'category', 'currency', 'count', 'mean', 'stdev']
+    list_filter = ['currency', 'category']
+    raw_id_fields = ['user']
+
+
+class ReadOnlySummaryAdmin(admin.ModelAdmin):
+    """Tables written only by the cohort job"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PlatformMonth)
+class PlatformMonthAdmin(ReadOnlySummaryAdmin):
+    list_display = ['__str__', 'active_users', 'growth', 'new_users', 'computed_at']
+    list_filter = ['year']
+    change_list_template = 'admin/budgets/platformmonth/change_list.html'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            previous_active=Window(Lag('active_users'), order_by=[F('year').asc(), F('month').asc()]),
+        )
+
+    @admin.display(description='growth')
+    def growth(self, obj):
+        if not obj.previous_active:
+            return '-'
+        return f'{(obj.active_users - obj.previous_active) / obj.previous_active:+.1%}'
+
+    def get_urls(self):
+        return [
+            path('recompute/', self.admin_site.admin_view(self.recompute_view),
+                 name='budgets_platformmonth_recompute'),
+        ] + super().get_urls()
+
+    def has_recompute_permission(self, request):
+        return request.user.has_perm('budgets.recompute_platformmonth')
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            'queued_months': ChangedMonth.objects.count(),
+            'can_recompute': self.has_recompute_permission(request),
+        }
+        return super().changelist_view(request, extra_context)
+
+    def recompute_view(self, request):
+        """Run the incremental job in-process; full rebuilds belong to the cohort_report command."""
+        # Imported here so workers don't load the process pool machinery at boot
+        from .cohorts import run_cohort_job
+
+        if not self.has_recompute_permission(request):
+            raise PermissionDenied
+        if request.method == 'POST':
+            months, _ = run_cohort_job(workers=1)
+            self.message_user(request, f'Recomputed {months} months.', messages.SUCCESS)
+        return redirect('admin:budgets_platformmonth_changelist')
+
+
+@admin.register(PlatformCategoryMonth)
+class PlatformCategoryMonthAdmin(ReadOnlySummaryAdmin):
+    list_display = ['year', 'month', 'kind', 'label', 'currency', 'total', 'count', 'users']
+    list_filter = ['year', 'kind', 'currency', 'label']
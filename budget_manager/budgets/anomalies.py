@@ -0,0 +1,97 @@
+"""Duplicate and outlier detection for new expenses.
+
+Checks run once, when an expense is created (see budgets.signals):
+
+* duplicate: another expense of the user with the same amount, currency and
+  title (ignoring case) within DUPLICATE_WINDOW_DAYS;
+* outlier: more than OUTLIER_Z standard deviations above the user's mean for
+  that category and currency, once there are OUTLIER_MIN_COUNT samples.
+
+The means and deviations come from ExpenseStats rows that every expense
+write updates in O(1), so no check ever rescans history; they cover roughly
+the last ExpenseStats.WINDOW expenses of each category. Flags are listed
+on the review page next to all expenses.
+"""
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models.functions import RowNumber
+
+from .models import Expense, ExpenseFlag, ExpenseStats
+
+DUPLICATE_WINDOW_DAYS = 3
+OUTLIER_Z = 3.0
+OUTLIER_MIN_COUNT = 8
+
+
+def _stats_for(user_id, category_id, currency):
+    stats, _ = ExpenseStats.objects.select_for_update().get_or_create(
+        user_id=user_id, category_id=category_id, currency=currency,
+    )
+    return stats
+
+
+def check_new_expense(expense, day):
+    """Flag a just-created expense and fold it into the running statistics."""
+    amount = float(expense.amount)
+    with transaction.atomic():
+        stats = _stats_for(expense.user_id, expense.category_id, expense.currency)
+        if stats.count >= OUTLIER_MIN_COUNT and stats.stdev > 0:
+            score = (amount - stats.mean) / stats.stdev
+            if score > OUTLIER_Z:
+                ExpenseFlag.objects.create(
+                    user_id=expense.user_id, expense=expense, kind=ExpenseFlag.OUTLIER, score=round(score, 2),
+                )
+        stats.add(amount)
+        stats.save(update_fields=['count', 'mean', 'm2'])
+
+    window = timedelta(days=DUPLICATE_WINDOW_DAYS)
+    original = Expense.objects.filter(
+        user_id=expense.user_id,
+        amount=expense.amount,
+        currency=expense.currency,
+        title__iexact=expense.title,
+        date__range=(day - window, day + window),
+    ).exclude(pk=expense.pk).order_by('date', 'id').first()
+    if original is not None:
+        ExpenseFlag.objects.create(
+            user_id=expense.user_id, expense=expense, kind=ExpenseFlag.DUPLICATE, duplicate_of=original,
+        )
+
+
+def update_stats(user_id, removed=None, added=None):
+    """Move one expense's contribution: ``removed``/``added`` are (category id, currency, amount)."""
+    with transaction.atomic():
+        for key, apply in ((removed, 'remove'), (added, 'add')):
+            if key is None:
+                continue
+            category_id, currency, amount = key
+            stats = _stats_for(user_id, category_id, currency)
+            getattr(stats, apply)(float(amount))
+            stats.save(update_fields=['count', 'mean', 'm2'])
+
+
+def rebuild_stats(user_id=None):
+    """Recompute the statistics from each group's latest ExpenseStats.WINDOW expenses."""
+    expenses = Expense.objects.all()
+    stats = ExpenseStats.objects.all()
+    if user_id is not None:
+        expenses = expenses.filter(user_id=user_id)
+        stats = stats.filter(user_id=user_id)
+    recent = expenses.annotate(
+        position=models.Window(
+            RowNumber(),
+            partition_by=[models.F('user_id'), models.F('category_id'), models.F('currency')],
+            order_by=[models.F('date').desc(), models.F('id').desc()],
+        ),
+    ).filter(position__lte=ExpenseStats.WINDOW).values_list('user_id', 'category_id', 'currency', 'amount')
+    groups = {}
+    for user, category, currency, amount in recent:
+        key = (user, category, currency)
+        if key not in groups:
+            groups[key] = ExpenseStats(user_id=user, category_id=category, currency=currency)
+        groups[key].add(float(amount))
+    with transaction.atomic():
+        stats.delete()
+        ExpenseStats.objects.bulk_create(groups.values())
+    return len(groups)
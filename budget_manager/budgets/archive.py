@@ -0,0 +1,138 @@
+"""Move old transactions out of the hot Income/Expense tables.
+
+Rows older than the horizon are copied to ArchivedTransaction and summed into
+MonthlyRollup, then deleted, so the hot tables and their indexes only hold
+recent months; each deleted row leaves a Tombstone for sync clients. Reports
+read the rollups for years flagged TransactionYear.archived (see
+reports.ArchivedTotals). Household expenses stay hot because household
+reports span several users' rows.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import (
+    ArchivedTransaction, DataVersion, Expense, ExpenseSplit, ExpenseTag, Income, MonthlyRollup,
+    Tombstone, TransactionYear,
+)
+from .signals import transaction_signals_suspended
+
+
+def archive_horizon(months=None):
+    """First day of the oldest month kept in the hot tables."""
+    if months is None:
+        months = settings.ARCHIVE_AFTER_MONTHS
+    today = timezone.localdate()
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rollups(incomes, expenses):
+    """{(year, month, kind, label, currency): (total, count)} for the rows being archived"""
+    sources = [
+        # kind, queryset, label field, amount field, prefix of the transaction fields
+        (MonthlyRollup.INCOME, incomes, None, 'amount', ''),
+        (MonthlyRollup.EXPENSE, expenses.filter(is_split=False), 'category__name', 'amount', ''),
+        (MonthlyRollup.EXPENSE,
+         ExpenseSplit.objects.filter(expense__in=expenses.filter(is_split=True)),
+         'category__name', 'amount', 'expense__'),
+        (MonthlyRollup.TAG, ExpenseTag.objects.filter(expense__in=expenses),
+         'tag__name', 'expense__amount', 'expense__'),
+    ]
+    rollups = {}
+    for kind, queryset, label, amount, prefix in sources:
+        currency, year, month = f'{prefix}currency', f'{prefix}date__year', f'{prefix}date__month'
+        fields = [currency, year, month] + ([label] if label else [])
+        rows = queryset.values(*fields).annotate(total=Sum(amount), count=Count('pk')).order_by()
+        for row in rows:
+            key = (row[year], row[month], kind, (row[label] or '') if label else '', row[currency])
+            total, count = rollups.get(key, (Decimal('0.00'), 0))
+            rollups[key] = (total + row['total'], count + row['count'])
+    return rollups
+
+
+def _merge_rollups(user_id, rollups):
+    """Add to existing rollups; back-dated entries can land in already archived months."""
+    existing = {
+        (r.year, r.month, r.kind, r.label, r.currency): r
+        for r in MonthlyRollup.objects.filter(user_id=user_id, year__in={key[0] for key in rollups})
+    }
+    changed, created = [], []
+    for key, (total, count) in rollups.items():
+        row = existing.get(key)
+        if row is None:
+            year, month, kind, label, currency = key
+            created.append(MonthlyRollup(
+                user_id=user_id, year=year, month=month, kind=kind, label=label,
+                currency=currency, total=total, count=count,
+            ))
+        else:
+            row.total += total
+            row.count += count
+            changed.append(row)
+    MonthlyRollup.objects.bulk_update(changed, ['total', 'count'])
+    MonthlyRollup.objects.bulk_create(created)
+
+
+def archive_user(user_id, before):
+    """Archive one user's transactions dated before ``before``; returns the number moved."""
+    incomes = Income.objects.filter(user_id=user_id, date__lt=before)
+    expenses = Expense.objects.filter(user_id=user_id, date__lt=before, household__isnull=True)
+
+    with transaction.atomic(), transaction_signals_suspended():
+        rollups = _rollups(incomes, expenses)
+        if not rollups:
+            return 0
+        _merge_rollups(user_id, rollups)
+
+        archived = [
+            ArchivedTransaction(
+                user_id=user_id, kind=ArchivedTransaction.INCOME, amount=row['amount'],
+                currency=row['currency'], title=row['source'],
+                description=row['description'] or '', date=row['date'],
+            )
+            for row in incomes.values('amount', 'currency', 'source', 'description', 'date').iterator()
+        ]
+        archived += [
+            ArchivedTransaction(
+                user_id=user_id, kind=ArchivedTransaction.EXPENSE, amount=row['amount'],
+                currency=row['currency'], title=row['title'], category_id=row['category_id'],
+                description=row['description'] or '', date=row['date'],
+            )
+            for row in expenses.values(
+                'amount', 'currency', 'title', 'category_id', 'description', 'date'
+            ).iterator()
+        ]
+        ArchivedTransaction.objects.bulk_create(archived, batch_size=1000)
+
+        # The delete signals are suspended, so sync clients are told here
+        gone = [(Tombstone.INCOME, pk) for pk in incomes.values_list('pk', flat=True)]
+        gone += [(Tombstone.EXPENSE, pk) for pk in expenses.values_list('pk', flat=True)]
+        top = DataVersion.next(user_id, len(gone))
+        Tombstone.objects.bulk_create([
+            Tombstone(user_id=user_id, kind=kind, object_id=pk, sync_seq=top - len(gone) + i)
+            for i, (kind, pk) in enumerate(gone, 1)
+        ], batch_size=1000)
+
+        incomes.delete()
+        expenses.delete()
+        for year in {row.date.year for row in archived}:
+            TransactionYear.refresh(user_id, year)
+    return len(archived)
+
+
+def archive_all(months=None, user_id=None):
+    """Archive every user with transactions older than the horizon; returns (users, rows)."""
+    before = archive_horizon(months)
+    user_ids = set()
+    for model in (Income, Expense):
+        qs = model.objects.filter(date__lt=before)
+        if user_id is not None:
+            qs = qs.filter(user_id=user_id)
+        user_ids.update(qs.values_list('user_id', flat=True).distinct())
+    moved = sum(archive_user(uid, before) for uid in sorted(user_ids))
+    return len(user_ids), moved
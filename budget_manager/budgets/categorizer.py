@@ -0,0 +1,149 @@
+"""Per-user expense category suggestions from past titles (multinomial naive Bayes).
+
+Each user's model is built once from their categorised expenses (archived
+ones included) and kept in process memory. Before answering, a cached model
+compares its position in the user's change sequence (DataVersion, see
+budgets.sync) with the current one and, if it is behind, learns only the
+expenses written since and forgets deleted ones. Every worker therefore
+stays current without ever retraining from scratch, and a suggestion costs
+one indexed version lookup plus a few dictionary reads.
+"""
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+
+from .models import ArchivedTransaction, DataVersion, Expense, Tombstone
+
+MODEL_CACHE_SIZE = 1000
+
+_token = re.compile(r'[a-z0-9]{2,}')
+
+
+def tokenize(title):
+    return _token.findall((title or '').lower())
+
+
+class CategoryModel:
+    """Token counts per category, with enough bookkeeping to forget a row again."""
+
+    def __init__(self):
+        self.seq = -1
+        self.docs = Counter()                      # category id -> number of expenses
+        self.tokens = defaultdict(Counter)         # category id -> token -> count
+        self.token_totals = Counter()              # category id -> number of tokens
+        self.vocabulary = Counter()                # token -> occurrences in all categories
+        self.rows = {}                             # expense key -> (tokens, category id)
+        self._vocabulary_size = 0
+        # Guards this model only, so one user's first build doesn't stall everyone else
+        self.lock = threading.Lock()
+
+    def learn(self, key, title, category_id):
+        self.forget(key)
+        if category_id is None:
+            return
+        words = tokenize(title)
+        self.rows[key] = (words, category_id)
+        self.docs[category_id] += 1
+        self.tokens[category_id].update(words)
+        self.token_totals[category_id] += len(words)
+        self.vocabulary.update(words)
+        self._vocabulary_size = None
+
+    def forget(self, key):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        words, category_id = row
+        self.docs[category_id] -= 1
+        self.tokens[category_id].subtract(words)
+        self.token_totals[category_id] -= len(words)
+        self.vocabulary.subtract(words)
+        self._vocabulary_size = None
+
+    def suggest(self, title, limit=3):
+        """[(category id, probability)] for a title, most likely first."""
+        words = [word for word in tokenize(title) if self.vocabulary[word] > 0]
+        total_docs = sum(self.docs.values())
+        if not words or not total_docs:
+            return []
+        if self._vocabulary_size is None:
+            self._vocabulary_size = sum(1 for count in self.vocabulary.values() if count > 0)
+        vocabulary_size = self._vocabulary_size
+        scores = {}
+        for category_id, docs in self.docs.items():
+            if docs <= 0:
+                continue
+            counts = self.tokens[category_id]
+            denominator = self.token_totals[category_id] + vocabulary_size
+            score = math.log(docs / total_docs)
+            for word in words:
+                score += math.log((counts[word] + 1) / denominator)
+            scores[category_id] = score
+        if not scores:
+            return []
+        # Normalise the log scores into probabilities
+        top = max(scores.values())
+        weights = {category_id: math.exp(score - top) for category_id, score in scores.items()}
+        norm = sum(weights.values())
+        ranked = sorted(weights.items(), key=lambda item: item[1], reverse=True)
+        return [(category_id, weight / norm) for category_id, weight in ranked[:limit]]
+
+    def catch_up(self, user_id, version):
+        """Apply the user's expense writes and deletes since this model's sequence number."""
+        if self.seq < 0:
+            archived = ArchivedTransaction.objects.filter(
+                user_id=user_id, kind=ArchivedTransaction.EXPENSE, category__isnull=False,
+            ).values_list('id', 'title', 'category_id')
+            for pk, title, category_id in archived:
+                self.learn(('archived', pk), title, category_id)
+        changed = Expense.objects.filter(user_id=user_id, sync_seq__gt=self.seq).values_list(
+            'id', 'title', 'category_id', 'sync_seq'
+        )
+        seq = max(self.seq, version)
+        for pk, title, category_id, row_seq in changed:
+            self.learn(pk, title, category_id)
+            seq = max(seq, row_seq)
+        if self.seq >= 0:
+            deleted = Tombstone.objects.filter(
+                user_id=user_id, kind=Tombstone.EXPENSE, sync_seq__gt=self.seq,
+            ).values_list('object_id', 'sync_seq')
+            for pk, row_seq in deleted:
+                self.forget(pk)
+                seq = max(seq, row_seq)
+        self.seq = seq
+
+
+_models = OrderedDict()
+_lock = threading.Lock()  # guards the LRU itself, never held while a model is built
+
+
+def model_for(user_id):
+    """The user's up-to-date model, from the in-process LRU cache when possible."""
+    version = DataVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+    with _lock:
+        model = _models.get(user_id)
+        if model is None:
+            model = _models[user_id] = CategoryModel()
+            if len(_models) > MODEL_CACHE_SIZE:
+                _models.popitem(last=False)
+        else:
+            _models.move_to_end(user_id)
+    with model.lock:
+        if model.seq < version:
+            model.catch_up(user_id, version)
+    return model
+
+
+def suggest_categories(user_id, title, limit=3):
+    """[(category id, probability)] suggestions for an expense title."""
+    if not tokenize(title):
+        return []
+    model = model_for(user_id)
+    with model.lock:
+        return model.suggest(title, limit)
+
+
+def clear_models():
+    with _lock:
+        _models.clear()
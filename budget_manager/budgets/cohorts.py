@@ -0,0 +1,192 @@
+"""Platform-wide monthly aggregates for operators (see the cohort_report command).
+
+The job splits users into id ranges and aggregates each range in a worker
+process, so the work spreads over cores and a worker never holds more than
+one range. Every user falls in exactly one range, so the per-range counts of
+distinct users simply add up. The results replace the PlatformMonth and
+PlatformCategoryMonth rows of the months processed.
+
+Transaction writes and signups queue their month in ChangedMonth (see
+budgets.signals) and a normal run recomputes only the queued months. A full run rebuilds
+everything, e.g. after imports that bypassed the signals.
+"""
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+import django
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import (
+    ChangedMonth, Expense, ExpenseSplit, Income, MonthlyRollup, PlatformCategoryMonth, PlatformMonth,
+)
+
+CHUNK_USERS = 1000
+
+
+def _in_months(months, prefix=''):
+    """Q for transaction dates inside any of the (year, month) pairs; everything if None."""
+    condition = Q()
+    if months is None:
+        return condition
+    for year, month in months:
+        condition |= Q(**{
+            f'{prefix}date__gte': date(year, month, 1),
+            f'{prefix}date__lt': date(year + month // 12, month % 12 + 1, 1),
+        })
+    return condition
+
+
+def _rollup_months(months):
+    condition = Q()
+    for year, month in months or ():
+        condition |= Q(year=year, month=month)
+    return condition
+
+
+def aggregate_users(first_id, end_id, months=None):
+    """Totals for users with first_id <= id < end_id.
+
+    Returns ({(year, month, kind, label, currency): (total, count, users)},
+    {(year, month): active users}).
+    """
+    sources = [
+        # kind, queryset, label field, prefix of the transaction fields
+        (PlatformCategoryMonth.INCOME, Income.objects.all(), None, ''),
+        (PlatformCategoryMonth.EXPENSE, Expense.objects.filter(is_split=False), 'category__name', ''),
+        (PlatformCategoryMonth.EXPENSE, ExpenseSplit.objects.all(), 'category__name', 'expense__'),
+    ]
+    totals = {}
+    active = defaultdict(set)
+
+    def add(user_id, year, month, kind, label, currency, total, count):
+        entry = totals.setdefault((year, month, kind, label, currency), [Decimal('0.00'), 0, set()])
+        entry[0] += total
+        entry[1] += count
+        entry[2].add(user_id)
+        active[(year, month)].add(user_id)
+
+    for kind, queryset, label, prefix in sources:
+        user, year, month = f'{prefix}user_id', f'{prefix}date__year', f'{prefix}date__month'
+        currency = f'{prefix}currency'
+        fields = [user, year, month, currency] + ([label] if label else [])
+        rows = queryset.filter(
+            _in_months(months, prefix),
+            **{f'{prefix}user_id__gte': first_id, f'{prefix}user_id__lt': end_id},
+        ).values(*fields).annotate(total=Sum('amount'), count=Count('pk')).order_by()
+        for row in rows:
+            add(row[user], row[year], row[month], kind, (row[label] or '') if label else '',
+                row[currency], row['total'], row['count'])
+
+    archived = MonthlyRollup.objects.filter(
+        user_id__gte=first_id, user_id__lt=end_id,
+        kind__in=[MonthlyRollup.INCOME, MonthlyRollup.EXPENSE],
+    )
+    if months is not None:
+        archived = archived.filter(_rollup_months(months))
+    for row in archived.values_list('user_id', 'year', 'month', 'kind', 'label', 'currency', 'total', 'count'):
+        add(*row)
+
+    return (
+        {key: (total, count, len(users)) for key, (total, count, users) in totals.items()},
+        {key: len(users) for key, users in active.items()},
+    )
+
+
+def _user_ranges(chunk_users):
+    bounds = User.objects.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return []
+    return [
+        (first_id, min(first_id + chunk_users, bounds['last'] + 1))
+        for first_id in range(bounds['first'], bounds['last'] + 1, chunk_users)
+    ]
+
+
+def _signups(months):
+    rows = User.objects.annotate(
+        year=ExtractYear('date_joined'), month=ExtractMonth('date_joined'),
+    ).values('year', 'month').annotate(n=Count('id')).order_by()
+    return {
+        (row['year'], row['month']): row['n'] for row in rows
+        if months is None or (row['year'], row['month']) in months
+    }
+
+
+def run_cohort_job(full=False, workers=None, chunk_users=CHUNK_USERS):
+    """Recompute the queued months (or all of them); returns (months written, user ranges)."""
+    if full:
+        ChangedMonth.objects.all().delete()
+        months = None
+    else:
+        # Claim the queue first: writes during the run queue their month again
+        with transaction.atomic():
+            queued = list(ChangedMonth.objects.values_list('id', 'year', 'month'))
+            ChangedMonth.objects.filter(id__in=[pk for pk, _, _ in queued]).delete()
+        months = {(year, month) for _, year, month in queued}
+        if not months:
+            return 0, 0
+
+    try:
+        ranges = _user_ranges(chunk_users)
+        month_list = sorted(months) if months is not None else None
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(ranges) <= 1:
+            results = [aggregate_users(first_id, end_id, month_list) for first_id, end_id in ranges]
+        else:
+            # Forked workers must not share the parent's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), initializer=django.setup) as pool:
+                results = list(pool.map(
+                    aggregate_users, *zip(*ranges), [month_list] * len(ranges),
+                ))
+        written = _write(months, results)
+    except BaseException:
+        if months:
+            ChangedMonth.mark(*(date(year, month, 1) for year, month in months))
+        raise
+    return written, len(ranges)
+
+
+def _write(months, results):
+    categories = defaultdict(lambda: [Decimal('0.00'), 0, 0])
+    active = Counter()
+    for chunk_totals, chunk_active in results:
+        for key, (total, count, users) in chunk_totals.items():
+            entry = categories[key]
+            entry[0] += total
+            entry[1] += count
+            entry[2] += users
+        active.update(chunk_active)
+    signups = _signups(months)
+
+    now = timezone.now()
+    month_rows = PlatformMonth.objects.all()
+    category_rows = PlatformCategoryMonth.objects.all()
+    if months is not None:
+        month_rows = month_rows.filter(_rollup_months(months))
+        category_rows = category_rows.filter(_rollup_months(months))
+    with transaction.atomic():
+        month_rows.delete()
+        category_rows.delete()
+        PlatformMonth.objects.bulk_create([
+            PlatformMonth(
+                year=year, month=month, active_users=active[(year, month)],
+                new_users=signups.get((year, month), 0), computed_at=now,
+            )
+            for year, month in sorted(set(active) | set(signups))
+        ])
+        PlatformCategoryMonth.objects.bulk_create([
+            PlatformCategoryMonth(
+                year=year, month=month, kind=kind, label=label, currency=currency,
+                total=total, count=count, users=users,
+            )
+            for (year, month, kind, label, currency), (total, count, users) in categories.items()
+        ], batch_size=1000)
+    return len(set(active) | set(signups)) if months is None else len(months)
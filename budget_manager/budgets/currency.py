@@ -0,0 +1,158 @@
+"""Currencies, the exchange-rate table and currency-aware aggregation.
+
+Rates are stored per (currency, year, month) as the value of one unit in
+settings.EXCHANGE_RATE_PIVOT. Report totals are computed with one grouped
+query per figure -- ``SUM(amount) GROUP BY currency, year, month`` -- and each
+group is converted with its month's rate, so the Python work is bounded by
+currencies x months rather than by the number of transactions.
+"""
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_CHOICES = [
+    ('INR', 'Indian Rupee'),
+    ('USD', 'US Dollar'),
+    ('EUR', 'Euro'),
+    ('GBP', 'British Pound'),
+    ('AED', 'UAE Dirham'),
+    ('SGD', 'Singapore Dollar'),
+    ('AUD', 'Australian Dollar'),
+    ('CAD', 'Canadian Dollar'),
+    ('JPY', 'Japanese Yen'),
+]
+
+CURRENCY_SYMBOLS = {
+    'INR': '₹',
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'AED': 'AED ',
+    'SGD': 'S$',
+    'AUD': 'A$',
+    'CAD': 'C$',
+    'JPY': '¥',
+}
+
+DEFAULT_CURRENCY = 'INR'
+
+RATE_TABLE_CACHE_KEY = 'exchange-rate-table'
+
+CENTS = Decimal('0.01')
+
+
+def currency_symbol(code):
+    return CURRENCY_SYMBOLS.get(code, f'{code} ')
+
+
+def _cached_rate_table():
+    """(version, table). The version is derived from the rows themselves, so
+    every worker that loads the same rates computes the same version."""
+    cached = cache.get(RATE_TABLE_CACHE_KEY)
+    if cached is None:
+        from .models import ExchangeRate
+
+        table, count, latest = {}, 0, None
+        for currency, year, month, rate, updated_at in ExchangeRate.objects.order_by(
+            'currency', 'year', 'month'
+        ).values_list('currency', 'year', 'month', 'rate', 'updated_at'):
+            months, rates = table.setdefault(currency, ([], []))
+            months.append((year, month))
+            rates.append(rate)
+            count += 1
+            latest = updated_at if latest is None else max(latest, updated_at)
+        version = f'{count}.{int(latest.timestamp() * 1_000_000)}' if latest else '0'
+        cached = (version, table)
+        # Edits only drop this process's copy unless the cache is shared; the
+        # timeout bounds how long other workers keep converting with old rates
+        cache.set(RATE_TABLE_CACHE_KEY, cached, settings.RATE_TABLE_CACHE_SECONDS)
+    return cached
+
+
+def get_rate_table():
+    """{currency: ([(year, month), ...], [rate, ...])}, sorted by month; cached."""
+    return _cached_rate_table()[1]
+
+
+def rate_table_version():
+    """Changes whenever rates are imported or edited; part of ETags and cached forecasts."""
+    return _cached_rate_table()[0]
+
+
+def invalidate_rate_table():
+    cache.delete(RATE_TABLE_CACHE_KEY)
+
+
+def _pivot_rate(table, currency, year, month):
+    """Rate for the month, else the latest earlier month, else the earliest known."""
+    if currency == settings.EXCHANGE_RATE_PIVOT:
+        return Decimal('1')
+    if currency not in table:
+        return None
+    months, rates = table[currency]
+    index = bisect_right(months, (year, month))
+    return rates[index - 1] if index else rates[0]
+
+
+class RateConverter:
+    """Conversion factors into one base currency, memoised per (currency, month).
+
+    Amounts in a currency with no known rate are left out of the totals and
+    their (currency, year, month) recorded in ``missing``, so views can say so.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.version, self.table = _cached_rate_table()
+        self._factors = {}
+        self.missing = set()
+
+    def factor(self, currency, year, month):
+        """Multiplier into the base currency, or None when there is no rate."""
+        if currency == self.base:
+            return Decimal('1')
+        key = (currency, year, month)
+        if key not in self._factors:
+            source = _pivot_rate(self.table, currency, year, month)
+            target = _pivot_rate(self.table, self.base, year, month)
+            if source is None or target is None:
+                logger.warning('No exchange rate for %s -> %s in %s-%02d', currency, self.base, year, month)
+                self.missing.add(key)
+                self._factors[key] = None
+            else:
+                self._factors[key] = source / target
+        return self._factors[key]
+
+    def totals(self, queryset, key=None, amount='amount', prefix='', period=None):
+        """Sum ``amount`` in the base currency, grouped by ``key`` (a field path) if given.
+
+        ``prefix`` points at the transaction holding ``currency`` and ``date``
+        when aggregating a related table, e.g. ``'expense__'`` for split lines.
+        ``period`` names the (year, month) fields of tables without a date,
+        and a tuple ``key`` groups by several fields at once.
+        """
+        currency = f'{prefix}currency'
+        year, month = period or (f'{prefix}date__year', f'{prefix}date__month')
+        keys = list(key) if isinstance(key, tuple) else [key] if key else []
+        rows = queryset.values(*keys, currency, year, month).annotate(subtotal=Sum(amount)).order_by()
+        totals = defaultdict(Decimal)
+        for row in rows:
+            factor = self.factor(row[currency], row[year], row[month])
+            if factor is None:
+                continue
+            if isinstance(key, tuple):
+                group = tuple(row[k] for k in keys)
+            else:
+                group = row[key] if key else None
+            totals[group] += row['subtotal'] * factor
+        return {group: total.quantize(CENTS) for group, total in totals.items()}
+
+    def total(self, queryset):
+        return self.totals(queryset).get(None, Decimal('0.00'))
@@ -0,0 +1,47 @@
+from functools import wraps
+
+from django.contrib import messages
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .currency import rate_table_version
+from .models import DataVersion
+
+
+def data_version(request):
+    """Load the user's DataVersion once per request (ETag and Last-Modified both need it)."""
+    if not hasattr(request, '_data_version'):
+        request._data_version = DataVersion.for_user(request.user.pk)
+    return request._data_version
+
+
+def user_data_etag(request, *args, **kwargs):
+    # Pending flash messages are rendered into the page, so never answer 304 over them.
+    if not request.user.is_authenticated or len(messages.get_messages(request)):
+        return None
+    version = data_version(request)
+    # Pages default to the current month, so the ETag also rolls over daily.
+    # Totals are converted with the rate table, so new rates change it too.
+    return f'"{request.user.pk}-{version.version}-{rate_table_version()}-{timezone.localdate():%Y%m%d}"'
+
+
+def user_data_last_modified(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    start_of_day = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(data_version(request).updated_at, start_of_day)
+
+
+def user_data_conditional(view_func):
+    """Answer 304 Not Modified while the user's incomes and expenses are unchanged.
+
+    Responses are marked private and must be revalidated, so browsers keep a
+    copy but always ask first.
+    """
+    @wraps(view_func)
+    @cache_control(private=True, no_cache=True)
+    @condition(etag_func=user_data_etag, last_modified_func=user_data_last_modified)
+    def _wrapped(request, *args, **kwargs):
+        return view_func(request, *args, **kwargs)
+    return _wrapped
@@ -0,0 +1,121 @@
+"""Month-end and savings-goal forecasts from the user's monthly history.
+
+The user's income and expenses per month over the last HISTORY_MONTHS full
+months (hot tables grouped by month, MonthlyRollup for archived months) and
+the current month so far take three grouped queries. The resulting forecast
+is cached under the user's DataVersion, which every write bumps, so it is
+recomputed only when new data arrives. The dashboard reuses the version its
+ETag check already loaded; only the goals themselves are read per render.
+"""
+import math
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .currency import CENTS
+from .models import Expense, Income, MonthlyRollup
+
+HISTORY_MONTHS = 6
+CACHE_TIMEOUT = 60 * 60 * 24
+# Goals further out than this get no expected date (and would overflow date())
+MAX_GOAL_MONTHS = 100 * 12
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _first_of(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def monthly_totals(converter, user_id, since):
+    """{(year, month): [income, expenses]} in the base currency from ``since`` on"""
+    months = defaultdict(lambda: [Decimal('0.00'), Decimal('0.00')])
+    for column, model in enumerate((Income, Expense)):
+        rows = model.objects.filter(user_id=user_id, date__gte=since)
+        for month, total in converter.totals(rows, ('date__year', 'date__month')).items():
+            months[month][column] += total
+    rollups = MonthlyRollup.objects.filter(
+        Q(year__gt=since.year) | Q(year=since.year, month__gte=since.month),
+        user_id=user_id, kind__in=[MonthlyRollup.INCOME, MonthlyRollup.EXPENSE],
+    )
+    totals = converter.totals(rollups, ('kind', 'year', 'month'), amount='total', period=('year', 'month'))
+    for (kind, year, month), total in totals.items():
+        months[(year, month)][0 if kind == MonthlyRollup.INCOME else 1] += total
+    return months
+
+
+def compute_forecast(converter, user_id, today):
+    """Projected month-end figures and the average monthly savings of recent months."""
+    current = _month_index(today)
+    months = monthly_totals(converter, user_id, _first_of(current - HISTORY_MONTHS))
+    income, expenses = months.get((today.year, today.month), (Decimal('0.00'), Decimal('0.00')))
+
+    history = [months.get((day.year, day.month)) for day in map(_first_of, range(current - HISTORY_MONTHS, current))]
+    # Average from the first month with any activity, not over months before the user started
+    while history and history[0] is None:
+        history.pop(0)
+    history = [month or (Decimal('0.00'), Decimal('0.00')) for month in history]
+
+    days = monthrange(today.year, today.month)[1]
+    if history:
+        average_income = sum((month[0] for month in history), Decimal('0.00')) / len(history)
+        average_expenses = sum((month[1] for month in history), Decimal('0.00')) / len(history)
+        # Income tends to arrive in one payment; spending accrues day by day
+        projected_income = max(income, average_income)
+        projected_expenses = expenses + average_expenses * (days - today.day) / days
+        monthly_savings = (average_income - average_expenses).quantize(CENTS)
+    else:
+        projected_income = income
+        projected_expenses = expenses * days / today.day
+        monthly_savings = None
+    return {
+        'income': projected_income.quantize(CENTS),
+        'expenses': projected_expenses.quantize(CENTS),
+        'remaining': (projected_income - projected_expenses).quantize(CENTS),
+        'monthly_savings': monthly_savings,
+        'history_months': len(history),
+    }
+
+
+def forecast_for(converter, user_id, version, today):
+    """The user's forecast, cached until their data version, the rates or the day change."""
+    key = f'forecast:{user_id}:{version}:{converter.base}:{converter.version}:{today:%Y%m%d}'
+    forecast = cache.get(key)
+    if forecast is None:
+        forecast = compute_forecast(converter, user_id, today)
+        cache.set(key, forecast, CACHE_TIMEOUT)
+    return forecast
+
+
+def goal_progress(goal, forecast, converter, today):
+    """Amount left, savings needed per month and expected completion of one goal."""
+    # Without a rate the goal is shown in its own amounts; converter.missing flags it
+    factor = converter.factor(goal.currency, today.year, today.month) or Decimal('1')
+    target = (goal.target_amount * factor).quantize(CENTS)
+    saved = (goal.saved_amount * factor).quantize(CENTS)
+    left = max(target - saved, Decimal('0.00'))
+    months_left = _month_index(goal.deadline) - _month_index(today)
+    savings = forecast['monthly_savings']
+
+    if not left:
+        months_needed = 0
+    elif savings and savings > 0 and left / savings <= MAX_GOAL_MONTHS:
+        months_needed = math.ceil(left / savings)
+    else:
+        months_needed = None
+    return {
+        'goal': goal,
+        'target': target,
+        'saved': saved,
+        'left': left,
+        'percent': min(int(saved * 100 / target), 100) if target else 100,
+        'per_month': (left / max(months_left, 1)).quantize(CENTS),
+        'expected': _first_of(_month_index(today) + months_needed) if months_needed is not None else None,
+        'on_track': months_needed is not None and months_needed <= max(months_left, 0),
+    }
@@ -0,0 +1,121 @@
+"""Live dashboard updates over server-sent events (see views.api.live_updates_view).
+
+Writes to Income/Expense publish a small delta (the changed transaction and
+the new totals of its month) to an in-process broker keyed by user, and every
+open event stream of that user forwards it. Nothing is computed unless the
+user has a stream open. The broker lives in one process, so run a single
+ASGI worker (or put a shared broker behind ``broker``) when users may have
+several devices on different workers.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from datetime import date
+
+from accounts.models import Profile
+
+from .currency import RateConverter, currency_symbol
+from .models import Expense, Income
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 100
+
+
+def _offer(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        # A stalled client misses deltas; the totals in the next one are complete again
+        pass
+
+
+class Broker:
+    """Per-user fan-out from (sync) publishers to asyncio queues of open streams."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscribers
+
+    def publish(self, user_id, event, data):
+        message = f'event: {event}\ndata: {json.dumps(data)}\n\n'
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # The stream's event loop has shut down; its finally block never ran
+                self.unsubscribe(user_id, (loop, queue))
+
+
+broker = Broker()
+
+
+async def event_stream(user_id):
+    """Server-sent events for one client: deltas as they arrive, comments as heartbeats."""
+    subscription = broker.subscribe(user_id)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription[1].get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(user_id, subscription)
+
+
+def month_totals(user_id, year, month):
+    """Income, expenses and remaining for one month in the user's base currency."""
+    converter = RateConverter(Profile.base_currency_for(user_id))
+    income = converter.total(Income.objects.filter(user_id=user_id, date__year=year, date__month=month))
+    expenses = converter.total(Expense.objects.filter(user_id=user_id, date__year=year, date__month=month))
+    return {
+        'year': year,
+        'month': month,
+        'currency_symbol': currency_symbol(converter.base),
+        'income': str(income),
+        'expenses': str(expenses),
+        'remaining': str(income - expenses),
+    }
+
+
+def change_payload(instance, deleted=False):
+    """The delta for a saved or deleted Income/Expense, taken before the delete clears its pk."""
+    is_expense = isinstance(instance, Expense)
+    day = instance._meta.get_field('date').to_python(instance.date)
+    return {
+        'type': 'expense' if is_expense else 'income',
+        'id': instance.pk,
+        'deleted': deleted,
+        'amount': str(instance.amount),
+        'currency_symbol': instance.currency_symbol,
+        'title': instance.title if is_expense else instance.source,
+        'category': instance.category.get_name_display() if is_expense and instance.category else '',
+        'date': day.isoformat(),
+    }
+
+
+def publish_change(user_id, payload):
+    """Push a change and its month's new totals to the user's streams."""
+    day = date.fromisoformat(payload['date'])
+    payload['totals'] = month_totals(user_id, day.year, day.month)
+    broker.publish(user_id, 'change', payload)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from budgets.archive import archive_all, archive_horizon
+
+
+class Command(BaseCommand):
+    help = "Move incomes and expenses older than the archive horizon into the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, help='Keep this many months hot (default: ARCHIVE_AFTER_MONTHS)')
+        parser.add_argument('--user-id', type=int, help='Only archive this user')
+
+    def handle(self, *args, **options):
+        months = options.get('months')
+        if months is not None and months < 2:
+            # The dashboard's month comparison always reads this and last month
+            raise CommandError("--months must be at least 2")
+        users, moved = archive_all(months=months, user_id=options.get('user_id'))
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} transactions of {users} users dated before {archive_horizon(months)}"
+        ))
@@ -0,0 +1,125 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from budgets.models import Expense, ExpenseCategory, Income
+from budgets.signals import transaction_signals_suspended
+
+USER_PREFIX = 'bench-admin-'
+TITLES = ['Coffee', 'Groceries', 'Uber ride', 'Lunch', 'Electricity bill', 'Cinema', 'Rent', 'Pharmacy']
+
+
+class LegacyIncomeAdmin(admin.ModelAdmin):
+    """The income changelist as it was before LargeTableAdmin, for comparison"""
+    list_display = ['user', 'source', 'amount', 'currency', 'date', 'created_at']
+    list_filter = ['date', 'currency', 'user']
+    search_fields = ['source', 'description']
+    date_hierarchy = 'date'
+
+
+class LegacyExpenseAdmin(admin.ModelAdmin):
+    """The expense changelist as it was before LargeTableAdmin, for comparison"""
+    list_display = ['user', 'title', 'category', 'amount', 'currency', 'is_split', 'date', 'created_at']
+    list_filter = ['category', 'date', 'currency', 'is_split', 'user']
+    search_fields = ['title', 'description']
+    date_hierarchy = 'date'
+
+
+class Command(BaseCommand):
+    help = "Seed a large dataset and time the Income/Expense admin changelists, old and current"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=300000, help='Expenses to seed (default 300000)')
+        parser.add_argument('--users', type=int, default=500, help='Users to spread them over (default 500)')
+        parser.add_argument('--runs', type=int, default=3, help='Requests per changelist (default 3)')
+        parser.add_argument('--clear', action='store_true', help='Delete the seeded data and exit')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            with transaction_signals_suspended():
+                deleted, _ = User.objects.filter(username__startswith=USER_PREFIX).delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} rows"))
+            return
+
+        users = self.seed(max(1, options['users']), max(0, options['rows']))
+        some_user = users[len(users) // 2]
+        cases = [
+            ('expenses', Expense, {}),
+            ('expenses p.50', Expense, {'p': '50'}),
+            ('expenses by user', Expense, {'user': str(some_user)}),
+            ('expenses search', Expense, {'q': 'pharmacy'}),
+            ('incomes', Income, {}),
+            ('incomes by user', Income, {'user': str(some_user)}),
+        ]
+        legacy = {Income: LegacyIncomeAdmin, Expense: LegacyExpenseAdmin}
+        runs = max(1, options['runs'])
+
+        self.stdout.write(
+            f"\n{'changelist':<20}{'old ms':>10}{'old q':>7}{'new ms':>10}{'new q':>7}"
+        )
+        for label, model, params in cases:
+            old_params = dict(params)
+            if 'user' in old_params:
+                old_params['user__id__exact'] = old_params.pop('user')
+            old_ms, old_queries = self.time_changelist(legacy[model](model, admin.site), old_params, runs)
+            new_ms, new_queries = self.time_changelist(admin.site._registry[model], params, runs)
+            self.stdout.write(f"{label:<20}{old_ms:>10.1f}{old_queries:>7}{new_ms:>10.1f}{new_queries:>7}")
+
+    def seed(self, user_count, rows):
+        """Create the bench users and top their expenses (and a tenth as many incomes) up to ``rows``."""
+        existing = set(User.objects.filter(username__startswith=USER_PREFIX).values_list('username', flat=True))
+        User.objects.bulk_create([
+            User(username=f'{USER_PREFIX}{i}') for i in range(user_count)
+            if f'{USER_PREFIX}{i}' not in existing
+        ])
+        users = list(User.objects.filter(username__startswith=USER_PREFIX).values_list('pk', flat=True))
+        categories = list(ExpenseCategory.objects.all()) or [None]
+
+        have = Expense.objects.filter(user_id__in=users).count()
+        missing = rows - have
+        if missing <= 0:
+            return users
+        self.stdout.write(f"Seeding {missing} expenses and {missing // 10} incomes...")
+        start = time.perf_counter()
+        today = date.today()
+        rng = random.Random(have)
+        for offset in range(0, missing, 5000):
+            batch = min(5000, missing - offset)
+            Expense.objects.bulk_create([
+                Expense(
+                    user_id=rng.choice(users), category=rng.choice(categories), title=rng.choice(TITLES),
+                    amount=Decimal(rng.randint(100, 50000)) / 100, date=today - timedelta(days=rng.randint(0, 1500)),
+                )
+                for _ in range(batch)
+            ])
+            Income.objects.bulk_create([
+                Income(
+                    user_id=rng.choice(users), source='Salary', amount=Decimal(rng.randint(100000, 900000)) / 100,
+                    date=today - timedelta(days=rng.randint(0, 1500)),
+                )
+                for _ in range(batch // 10)
+            ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f"Seeded in {time.perf_counter() - start:.1f} s")
+        return users
+
+    def time_changelist(self, model_admin, params, runs):
+        request = RequestFactory().get('/admin/', params)
+        request.user = User(username='bench', is_active=True, is_staff=True, is_superuser=True)
+        model_admin.changelist_view(request).render()  # warm up
+        timings = []
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                model_admin.changelist_view(request).render()
+                timings.append((time.perf_counter() - start) * 1000)
+        return min(timings), len(queries)
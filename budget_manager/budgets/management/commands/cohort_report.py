@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from budgets.cohorts import CHUNK_USERS, run_cohort_job
+
+
+class Command(BaseCommand):
+    help = "Recompute the platform-wide monthly aggregates shown in the admin"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Rebuild every month instead of only months with changes')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+        parser.add_argument('--chunk-users', type=int, default=CHUNK_USERS,
+                            help=f'User ids per worker task (default {CHUNK_USERS})')
+
+    def handle(self, *args, **options):
+        if options['chunk_users'] < 1 or (options['workers'] is not None and options['workers'] < 1):
+            raise CommandError("--workers and --chunk-users must be positive")
+        start = time.perf_counter()
+        months, ranges = run_cohort_job(
+            full=options['full'], workers=options['workers'], chunk_users=options['chunk_users'],
+        )
+        if not ranges:
+            self.stdout.write("Nothing to do")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {months} months over {ranges} user ranges in {time.perf_counter() - start:.1f} s"
+        ))
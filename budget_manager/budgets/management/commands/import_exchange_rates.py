@@ -0,0 +1,53 @@
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from budgets.currency import CURRENCY_SYMBOLS, invalidate_rate_table
+from budgets.models import ExchangeRate
+
+
+class Command(BaseCommand):
+    help = (
+        "Load monthly exchange rates from a CSV file with columns month,currency,rate "
+        "(month as YYYY-MM or YYYY-MM-DD; rate = value of one unit in EXCHANGE_RATE_PIVOT)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+
+    def handle(self, *args, **options):
+        rates = {}
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as fh:
+                for line, row in enumerate(csv.DictReader(fh), start=2):
+                    currency, year, month, rate = self.parse_row(row, line)
+                    rates[currency, year, month] = rate
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        ExchangeRate.objects.bulk_create(
+            [
+                ExchangeRate(currency=currency, year=year, month=month, rate=rate)
+                for (currency, year, month), rate in rates.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['currency', 'year', 'month'],
+            update_fields=['rate', 'updated_at'],
+        )
+        # bulk_create skips the post_save signal that normally drops the cache
+        invalidate_rate_table()
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(rates)} exchange rates"))
+
+    def parse_row(self, row, line):
+        try:
+            year, month = (int(part) for part in row['month'].strip().split('-')[:2])
+            currency = row['currency'].strip().upper()
+            rate = Decimal(row['rate'].strip())
+        except (KeyError, AttributeError, ValueError, InvalidOperation):
+            raise CommandError(f"Line {line}: expected month,currency,rate, got {row}")
+        if currency not in CURRENCY_SYMBOLS:
+            raise CommandError(f"Line {line}: unsupported currency {currency}")
+        if not 1 <= month <= 12 or rate <= 0:
+            raise CommandError(f"Line {line}: invalid month or rate")
+        return currency, year, month, rate
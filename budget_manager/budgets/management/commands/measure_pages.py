@@ -0,0 +1,55 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+
+DEFAULT_PAGES = [
+    'dashboard',
+    'add_income',
+    'add_expense',
+    'all_expenses',
+    'all_incomes',
+    'compare_months',
+    'yearly_report',
+]
+
+
+class Command(BaseCommand):
+    help = "Render the main pages for a user and report HTML bytes and render time"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User to render the pages as')
+        parser.add_argument('--runs', type=int, default=20, help='Requests per page (default 20)')
+        parser.add_argument('--page', action='append', dest='pages', help='URL name to measure (repeatable)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist")
+
+        runs = max(1, options['runs'])
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        self.stdout.write(f"{'page':<16}{'bytes':>10}{'avg ms':>10}{'min ms':>10}")
+        total_bytes = 0
+        for name in options['pages'] or DEFAULT_PAGES:
+            url = reverse(name)
+            client.get(url)  # warm template and query caches
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}")
+            size = len(response.content)
+            total_bytes += size
+            self.stdout.write(
+                f"{name:<16}{size:>10}{sum(timings) / runs:>10.2f}{min(timings):>10.2f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Total HTML: {total_bytes} bytes"))
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: load the application, then the URLconf (which
+# imports every view module), the way a worker does before its first request.
+LOAD_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+__import__(sys.argv[1])
+loaded = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+routed = time.perf_counter()
+print((loaded - start) * 1000, (routed - loaded) * 1000)
+'''
+
+ENTRY_POINTS = {
+    'wsgi': 'budget_manager.wsgi',
+    'asgi': 'budget_manager.asgi',
+}
+
+
+class Command(BaseCommand):
+    help = "Report import-time breakdown and cold-start time of the WSGI/ASGI application"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts per entry point (default 5)')
+        parser.add_argument('--top', type=int, default=15, help='Imports and packages to list (default 15)')
+        parser.add_argument('--entry', choices=sorted(ENTRY_POINTS), action='append', dest='entries',
+                            help='Entry point to measure (repeatable, default both)')
+
+    def handle(self, *args, **options):
+        entries = options['entries'] or list(ENTRY_POINTS)
+        self.stdout.write(f"{'entry':<8}{'process ms':>12}{'app ms':>10}{'urls ms':>10}   (min of {options['runs']})")
+        for entry in entries:
+            timings = [self.cold_start(ENTRY_POINTS[entry]) for _ in range(max(1, options['runs']))]
+            process_ms, app_ms, urls_ms = (min(column) for column in zip(*timings))
+            self.stdout.write(f"{entry:<8}{process_ms:>12.1f}{app_ms:>10.1f}{urls_ms:>10.1f}")
+
+        imports = self.import_times(ENTRY_POINTS[entries[0]])
+        top = options['top']
+        packages = defaultdict(int)
+        for _, self_us, _, name in imports:
+            packages[name.split('.')[0]] += self_us
+        self.stdout.write(f"\nImport time by top-level package ({entries[0]}, self time):")
+        for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+            self.stdout.write(f"{self_us / 1000:>10.1f} ms  {package}")
+
+        self.stdout.write("\nSlowest imports (cumulative):")
+        for depth, self_us, cumulative_us, name in sorted(imports, key=lambda row: row[2], reverse=True)[:top]:
+            self.stdout.write(f"{cumulative_us / 1000:>10.1f} ms  {'  ' * depth}{name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{len(imports)} modules imported, {sum(packages.values()) / 1000:.1f} ms in total"
+        ))
+
+    def run(self, *args):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, *args], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+        return result
+
+    def cold_start(self, module):
+        """(process wall ms, application load ms, URLconf load ms) of one fresh interpreter"""
+        start = time.perf_counter()
+        result = self.run('-c', LOAD_SCRIPT, module)
+        process_ms = (time.perf_counter() - start) * 1000
+        app_ms, urls_ms = (float(value) for value in result.stdout.split())
+        return process_ms, app_ms, urls_ms
+
+    def import_times(self, module):
+        """[(depth, self us, cumulative us, module)] parsed from ``python -X importtime``"""
+        result = self.run('-X', 'importtime', '-c', LOAD_SCRIPT, module)
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            imports.append((depth, int(self_us), int(cumulative_us), name.strip()))
+        return imports
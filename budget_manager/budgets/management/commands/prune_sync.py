@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from budgets.sync import prune_sync_history
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones and idempotency records older than SYNC_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        tombstones, writes = prune_sync_history()
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {tombstones} tombstones and {writes} sync writes older than "
+            f"{settings.SYNC_RETENTION_DAYS} days"
+        ))
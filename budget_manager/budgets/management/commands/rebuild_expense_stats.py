@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from budgets.anomalies import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the running expense statistics used for outlier detection"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='Only rebuild this user')
+
+    def handle(self, *args, **options):
+        count = rebuild_stats(user_id=options.get('user_id'))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} statistics rows"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from budgets.models import TransactionYear
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user active years index from incomes and expenses"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='Only rebuild this user')
+
+    def handle(self, *args, **options):
+        count = TransactionYear.rebuild(user_id=options.get('user_id'))
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} user-year rows"))
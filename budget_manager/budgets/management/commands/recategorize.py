@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from budgets.anomalies import update_stats
+from budgets.categorizer import suggest_categories
+from budgets.models import ChangedMonth, DataVersion, Expense
+from budgets.signals import transaction_signals_suspended
+
+
+class Command(BaseCommand):
+    help = "Fill in the category of uncategorised expenses from each user's title-based suggestions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='Only recategorise this user')
+        parser.add_argument('--min-confidence', type=float, default=0.6,
+                            help='Leave rows alone when the best suggestion is less likely than this')
+        parser.add_argument('--dry-run', action='store_true', help='Report without saving')
+
+    def handle(self, *args, **options):
+        uncategorised = Expense.objects.filter(category__isnull=True)
+        if options.get('user_id') is not None:
+            uncategorised = uncategorised.filter(user_id=options['user_id'])
+        user_ids = sorted(set(uncategorised.values_list('user_id', flat=True)))
+
+        updated = skipped = 0
+        for user_id in user_ids:
+            rows = []
+            for expense in uncategorised.filter(user_id=user_id).only('id', 'user_id', 'title', 'currency', 'amount', 'date'):
+                suggestions = suggest_categories(user_id, expense.title, limit=1)
+                if suggestions and suggestions[0][1] >= options['min_confidence']:
+                    expense.category_id = suggestions[0][0]
+                    rows.append(expense)
+                else:
+                    skipped += 1
+            updated += len(rows)
+            if options['dry_run'] or not rows:
+                continue
+            with transaction.atomic(), transaction_signals_suspended():
+                # One version bump for the batch, but a distinct sequence number per row for sync
+                last = DataVersion.next(user_id, count=len(rows))
+                for seq, expense in enumerate(rows, start=last - len(rows) + 1):
+                    expense.sync_seq = seq
+                Expense.objects.bulk_update(rows, ['category', 'sync_seq'], batch_size=500)
+                ChangedMonth.mark(*(expense.date for expense in rows))
+                for expense in rows:
+                    update_stats(
+                        user_id,
+                        removed=(None, expense.currency, expense.amount),
+                        added=(expense.category_id, expense.currency, expense.amount),
+                    )
+
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {updated} expenses of {len(user_ids)} users; {skipped} left without a confident suggestion"
+        ))
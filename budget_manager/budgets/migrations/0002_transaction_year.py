@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_transaction_years(apps, schema_editor):
+    TransactionYear = apps.get_model('budgets', 'TransactionYear')
+    spans = {}
+    for name in ('Income', 'Expense'):
+        model = apps.get_model('budgets', name)
+        grouped = model.objects.values('user_id', 'date__year').annotate(
+            first=models.Min('date'), last=models.Max('date')
+        ).order_by()
+        for item in grouped:
+            key = (item['user_id'], item['date__year'])
+            first, last = spans.get(key, (item['first'], item['last']))
+            spans[key] = (min(first, item['first']), max(last, item['last']))
+    TransactionYear.objects.bulk_create([
+        TransactionYear(user_id=uid, year=year, first_date=first, last_date=last)
+        for (uid, year), (first, last) in spans.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('first_date', models.DateField()),
+                ('last_date', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transaction_years', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['year'],
+                'unique_together': {('user', 'year')},
+            },
+        ),
+        migrations.RunPython(backfill_transaction_years, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0005_households'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='is_split',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['name'],
+                'unique_together': {('user', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ExpenseTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expense', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_tags', to='budgets.expense')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_tags', to='budgets.tag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='expenses', through='budgets.ExpenseTag', to='budgets.tag'),
+        ),
+        migrations.CreateModel(
+            name='ExpenseSplit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='splits', to='budgets.expensecategory')),
+                ('expense', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='splits', to='budgets.expense')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expense', 'category'], name='budgets_exp_expense_8bb548_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='expensetag',
+            index=models.Index(fields=['tag', 'expense'], name='budgets_exp_tag_id_f9cfb0_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='expensetag',
+            unique_together={('expense', 'tag')},
+        ),
+    ]
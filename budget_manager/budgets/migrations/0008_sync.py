@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_sync_seq(apps, schema_editor):
+    """Give every existing row its own sequence number after the user's current version."""
+    DataVersion = apps.get_model('budgets', 'DataVersion')
+    versions = dict(DataVersion.objects.values_list('user_id', 'version'))
+    for name in ('Income', 'Expense'):
+        model = apps.get_model('budgets', name)
+        rows = list(model.objects.only('id', 'user_id').order_by('user_id', 'id'))
+        for row in rows:
+            versions[row.user_id] = versions.get(row.user_id, 0) + 1
+            row.sync_seq = versions[row.user_id]
+        model.objects.bulk_update(rows, ['sync_seq'], batch_size=1000)
+    for user_id, version in versions.items():
+        DataVersion.objects.update_or_create(user_id=user_id, defaults={'version': version})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0007_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncWrite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('result', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=7)),
+                ('object_id', models.BigIntegerField()),
+                ('sync_seq', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='sync_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='sync_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'date'], name='budgets_exp_user_id_633ff7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['household', 'date'], name='budgets_exp_househo_420941_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'sync_seq'], name='budgets_exp_user_id_07e99f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'sync_seq'], name='budgets_inc_user_id_7c93de_idx'),
+        ),
+        migrations.AddField(
+            model_name='syncwrite',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_writes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='syncwrite',
+            unique_together={('user', 'key')},
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'sync_seq'], name='budgets_tom_user_id_bc6e2f_idx'),
+        ),
+        migrations.RunPython(backfill_sync_seq, migrations.RunPython.noop),
+    ]
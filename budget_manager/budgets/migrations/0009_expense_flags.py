@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_expense_stats(apps, schema_editor):
+    Expense = apps.get_model('budgets', 'Expense')
+    ExpenseStats = apps.get_model('budgets', 'ExpenseStats')
+    rows = Expense.objects.values('user_id', 'category_id', 'currency').annotate(
+        n=models.Count('id'),
+        total=models.Sum('amount'),
+        squares=models.Sum(models.F('amount') * models.F('amount'), output_field=models.FloatField()),
+    ).order_by()
+    created = []
+    for row in rows:
+        mean = float(row['total']) / row['n']
+        created.append(ExpenseStats(
+            user_id=row['user_id'], category_id=row['category_id'], currency=row['currency'],
+            count=row['n'], mean=mean, m2=max(float(row['squares']) - row['n'] * mean * mean, 0.0),
+        ))
+    ExpenseStats.objects.bulk_create(created)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0008_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('duplicate', 'Possible duplicate'), ('outlier', 'Unusual amount')], max_length=9)),
+                ('score', models.FloatField(blank=True, null=True)),
+                ('dismissed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='budgets.expense')),
+                ('expense', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flags', to='budgets.expense')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_flags', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'dismissed'], name='budgets_exp_user_id_228a3e_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExpenseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(choices=[('INR', 'Indian Rupee'), ('USD', 'US Dollar'), ('EUR', 'Euro'), ('GBP', 'British Pound'), ('AED', 'UAE Dirham'), ('SGD', 'Singapore Dollar'), ('AUD', 'Australian Dollar'), ('CAD', 'Canadian Dollar'), ('JPY', 'Japanese Yen')], default='INR', max_length=3)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(default=0.0)),
+                ('m2', models.FloatField(default=0.0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='budgets.expensecategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'category', 'currency')},
+            },
+        ),
+        migrations.RunPython(backfill_expense_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:36
+
+from django.db import migrations, models
+
+
+def accept_existing_memberships(apps, schema_editor):
+    # Members added before invitations existed keep sharing their incomes
+    HouseholdMembership = apps.get_model('budgets', 'HouseholdMembership')
+    HouseholdMembership.objects.filter(accepted_at__isnull=True).update(accepted_at=models.F('joined_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0012_savings_goals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='householdmembership',
+            name='accepted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(accept_existing_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:47
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0013_household_invitations'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='platformmonth',
+            options={'ordering': ['-year', '-month'], 'permissions': [('recompute_platformmonth', 'Can recompute platform cohorts')]},
+        ),
+    ]
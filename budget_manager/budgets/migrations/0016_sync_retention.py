@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0015_exchange_rate_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataversion',
+            name='pruned_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='syncwrite',
+            index=models.Index(fields=['created_at'], name='budgets_syn_created_5b78e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='budgets_tom_deleted_ca1c2d_idx'),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 from decimal import Decimal
 
+from .currency import CURRENCY_CHOICES, DEFAULT_CURRENCY, currency_symbol
+
 
 class ExpenseCategory(models.Model):
     """Categories for expenses"""
@@ -34,39 +36,156 @@ class ExpenseCategory(models.Model):
         verbose_name_plural = "Expense Categories"
 
 
+class Household(models.Model):
+    """A group of users sharing expenses (family, flatmates)"""
+    name = models.CharField(max_length=100)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_households')
+    members = models.ManyToManyField(User, through='HouseholdMembership', related_name='households')
+    base_currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+
+
+class HouseholdMembership(models.Model):
+    """Membership of a user in a household"""
+    household = models.ForeignKey(Household, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='household_memberships')
+    joined_at = models.DateTimeField(auto_now_add=True)
+    # Null while the invitation is pending; only accepted members share their incomes
+    accepted_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def accepted(cls, **filters):
+        """Memberships the invited user has agreed to."""
+        return cls.objects.filter(accepted_at__isnull=False, **filters)
+
+    def __str__(self):
+        return f"{self.user.username} in {self.household.name}"
+
+    class Meta:
+        unique_together = ['household', 'user']
+        indexes = [models.Index(fields=['user', 'household'])]
+
+
 class Income(models.Model):
     """User's income records"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='incomes')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
     source = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     date = models.DateField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # DataVersion of the user when this row last changed (delta sync cursor)
+    sync_seq = models.PositiveBigIntegerField(default=0, editable=False)
     
     def __str__(self):
-        return f"{self.user.username} - {self.source} - ₹{self.amount}"
+        return f"{self.user.username} - {self.source} - {self.currency_symbol}{self.amount}"
+
+    def save(self, *args, **kwargs):
+        # The pre_save sync_seq bump must commit with the row, or a concurrent
+        # write could commit a higher seq first and sync cursors would skip this one
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    @property
+    def currency_symbol(self):
+        return currency_symbol(self.currency)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['user', 'sync_seq']),
+            # Admin changelist order across all users
+            models.Index(fields=['date', 'id']),
+        ]
 
 
 class Expense(models.Model):
     """User's expense records"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expenses')
     category = models.ForeignKey(ExpenseCategory, on_delete=models.SET_NULL, null=True, related_name='expenses')
+    household = models.ForeignKey(
+        Household, on_delete=models.SET_NULL, null=True, blank=True, related_name='expenses'
+    )
     amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
     title = models.CharField(max_length=200)
+    tags = models.ManyToManyField('Tag', through='ExpenseTag', related_name='expenses', blank=True)
+    # Split expenses are reported by their ExpenseSplit lines instead of ``category``
+    is_split = models.BooleanField(default=False)
     description = models.TextField(blank=True, null=True)
     date = models.DateField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # DataVersion of the user when this row last changed (delta sync cursor)
+    sync_seq = models.PositiveBigIntegerField(default=0, editable=False)
     
     def __str__(self):
-        return f"{self.user.username} - {self.title} - ₹{self.amount}"
+        return f"{self.user.username} - {self.title} - {self.currency_symbol}{self.amount}"
+
+    def save(self, *args, **kwargs):
+        # The pre_save sync_seq bump must commit with the row, or a concurrent
+        # write could commit a higher seq first and sync cursors would skip this one
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    @property
+    def currency_symbol(self):
+        return currency_symbol(self.currency)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['household', 'date']),
+            models.Index(fields=['user', 'sync_seq']),
+            # Admin changelist order across all users
+            models.Index(fields=['date', 'id']),
+        ]
+
+
+class Tag(models.Model):
+    """Free-form user label for expenses (projects, trips, ...)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tags')
+    name = models.CharField(max_length=50)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        unique_together = ['user', 'name']
+        ordering = ['name']
+
+
+class ExpenseTag(models.Model):
+    """Through table for Expense.tags, indexed for per-tag totals"""
+    expense = models.ForeignKey(Expense, on_delete=models.CASCADE, related_name='expense_tags')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='expense_tags')
+
+    class Meta:
+        unique_together = ['expense', 'tag']
+        indexes = [models.Index(fields=['tag', 'expense'])]
+
+
+class ExpenseSplit(models.Model):
+    """One category line of a split expense; lines add up to the expense amount"""
+    expense = models.ForeignKey(Expense, on_delete=models.CASCADE, related_name='splits')
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.SET_NULL, null=True, related_name='splits')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.expense.title} - {self.category} - {self.amount}"
+
+    class Meta:
+        indexes = [models.Index(fields=['expense', 'category'])]
 
 
 class Budget(models.Model):
@@ -85,3 +204,401 @@ class Budget(models.Model):
     class Meta:
         unique_together = ['user', 'category', 'month', 'year']
         ordering = ['-year', '-month']
+
+
+class ExchangeRate(models.Model):
+    """Monthly exchange rate: value of one unit of ``currency`` in settings.EXCHANGE_RATE_PIVOT"""
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES)
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1-12
+    rate = models.DecimalField(max_digits=18, decimal_places=8)
+    # Feeds the rate-table version that ETags and cached forecasts depend on
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.currency} {self.month}/{self.year} = {self.rate}"
+
+    class Meta:
+        unique_together = ['currency', 'year', 'month']
+        ordering = ['currency', '-year', '-month']
+
+
+class DataVersion(models.Model):
+    """Per-user counter bumped whenever the user's incomes or expenses change
+
+    Savings goal edits bump it too, since the dashboard shows them. It doubles
+    as the user's change sequence for delta sync: every saved Income/Expense
+    and every Tombstone carries the version it was written at.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='data_version')
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Tombstones up to this seq have been pruned; older sync cursors must resync in full
+    pruned_seq = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - v{self.version}"
+
+    @classmethod
+    def bump(cls, user_id, count=1):
+        updated = cls.objects.filter(user_id=user_id).update(
+            version=models.F('version') + count, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.get_or_create(user_id=user_id, defaults={'version': count})
+
+    @classmethod
+    def next(cls, user_id, count=1):
+        """Bump by ``count`` and return the new version; bulk writers number rows up to it."""
+        with transaction.atomic():
+            cls.bump(user_id, count)
+            return cls.objects.filter(user_id=user_id).values_list('version', flat=True).get()
+
+    @classmethod
+    def for_user(cls, user_id):
+        """Current version row; users with no writes yet get an unsaved version 0."""
+        row = cls.objects.filter(user_id=user_id).first()
+        if row is None:
+            row = cls(user_id=user_id, version=0, updated_at=timezone.now().replace(microsecond=0))
+        return row
+
+
+class TransactionYear(models.Model):
+    """Years in which a user has incomes or expenses, kept up to date on write"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transaction_years')
+    year = models.IntegerField()
+    first_date = models.DateField()
+    last_date = models.DateField()
+    # Some of the year's transactions live in ArchivedTransaction/MonthlyRollup
+    archived = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.year}"
+
+    @classmethod
+    def years_for(cls, user):
+        """Sorted list of years with activity for the year selectors."""
+        return list(cls.objects.filter(user=user).values_list('year', flat=True))
+
+    @classmethod
+    def index_for(cls, user):
+        """(sorted years, set of partly archived years) in one query."""
+        rows = list(cls.objects.filter(user=user).values_list('year', 'archived'))
+        return [year for year, _ in rows], {year for year, archived in rows if archived}
+
+    @classmethod
+    def record(cls, user_id, date):
+        """Widen the year row to cover a newly added transaction date."""
+        row, created = cls.objects.get_or_create(
+            user_id=user_id,
+            year=date.year,
+            defaults={'first_date': date, 'last_date': date},
+        )
+        if not created and (date < row.first_date or date > row.last_date):
+            row.first_date = min(row.first_date, date)
+            row.last_date = max(row.last_date, date)
+            row.save(update_fields=['first_date', 'last_date'])
+
+    @classmethod
+    def refresh(cls, user_id, year):
+        """Recompute a single year from the transaction tables (after deletes or moves)."""
+        bounds = [
+            model.objects.filter(user_id=user_id, date__year=year).aggregate(
+                first=models.Min('date'), last=models.Max('date')
+            )
+            for model in (Income, Expense, ArchivedTransaction)
+        ]
+        firsts = [b['first'] for b in bounds if b['first']]
+        lasts = [b['last'] for b in bounds if b['last']]
+        if not firsts:
+            cls.objects.filter(user_id=user_id, year=year).delete()
+            return
+        cls.objects.update_or_create(
+            user_id=user_id,
+            year=year,
+            defaults={
+                'first_date': min(firsts),
+                'last_date': max(lasts),
+                'archived': bounds[2]['first'] is not None,
+            },
+        )
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """Rebuild the index from scratch, for all users or a single one."""
+        rows = cls.objects.all()
+        if user_id is not None:
+            rows = rows.filter(user_id=user_id)
+        rows.delete()
+
+        spans = {}
+        archived = set()
+        for model in (Income, Expense, ArchivedTransaction):
+            qs = model.objects.all()
+            if user_id is not None:
+                qs = qs.filter(user_id=user_id)
+            grouped = qs.values('user_id', 'date__year').annotate(
+                first=models.Min('date'), last=models.Max('date')
+            ).order_by()
+            for item in grouped:
+                key = (item['user_id'], item['date__year'])
+                first, last = spans.get(key, (item['first'], item['last']))
+                spans[key] = (min(first, item['first']), max(last, item['last']))
+                if model is ArchivedTransaction:
+                    archived.add(key)
+
+        cls.objects.bulk_create([
+            cls(user_id=uid, year=year, first_date=first, last_date=last, archived=(uid, year) in archived)
+            for (uid, year), (first, last) in spans.items()
+        ])
+        return len(spans)
+
+    class Meta:
+        unique_together = ['user', 'year']
+        ordering = ['year']
+
+
+class ArchivedTransaction(models.Model):
+    """Compact copy of an Income or Expense moved out of the hot tables by budgets.archive"""
+    INCOME = 'income'
+    EXPENSE = 'expense'
+    KIND_CHOICES = [(INCOME, 'Income'), (EXPENSE, 'Expense')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_transactions')
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
+    title = models.CharField(max_length=200)  # Expense title or Income source
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.SET_NULL, null=True, blank=True)
+    description = models.TextField(blank=True)
+    date = models.DateField()
+
+    def __str__(self):
+        return f"{self.user.username} - {self.kind} - {self.title} - {self.amount}"
+
+    class Meta:
+        ordering = ['-date']
+        indexes = [models.Index(fields=['user', 'date'])]
+
+
+class MonthlyRollup(models.Model):
+    """Per-month totals of archived transactions, so reports never read the archive rows
+
+    ``label`` is the category name for expenses (split expenses by their lines),
+    the tag name for tags, and empty for incomes.
+    """
+    INCOME = 'income'
+    EXPENSE = 'expense'
+    TAG = 'tag'
+    KIND_CHOICES = [(INCOME, 'Income'), (EXPENSE, 'Expense'), (TAG, 'Tag')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_rollups')
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1-12
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    label = models.CharField(max_length=50, blank=True)
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
+    total = models.DecimalField(max_digits=14, decimal_places=2)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.month}/{self.year} - {self.kind} {self.label}"
+
+    class Meta:
+        unique_together = ['user', 'year', 'month', 'kind', 'label', 'currency']
+
+
+class Tombstone(models.Model):
+    """Record of a deleted Income/Expense, so sync clients can drop their copy"""
+    INCOME = 'income'
+    EXPENSE = 'expense'
+    KIND_CHOICES = [(INCOME, 'Income'), (EXPENSE, 'Expense')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tombstones')
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    sync_seq = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.kind} #{self.object_id} @ {self.sync_seq}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'sync_seq']),
+            # prune_sync_history
+            models.Index(fields=['deleted_at']),
+        ]
+
+
+class SyncWrite(models.Model):
+    """Result of an applied sync write, replayed when a client retries the same key"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sync_writes')
+    key = models.CharField(max_length=64)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.key}"
+
+    class Meta:
+        unique_together = ['user', 'key']
+        # prune_sync_history
+        indexes = [models.Index(fields=['created_at'])]
+
+
+class ExpenseStats(models.Model):
+    """Rolling amount statistics per user, category and currency
+
+    Maintained on every expense write by budgets.anomalies, so outlier checks
+    never rescan the user's history. Up to WINDOW expenses this is Welford's
+    algorithm; after that each new amount gets weight 1/WINDOW (an
+    exponentially weighted mean and variance), so spending habits from years
+    ago fade out instead of anchoring the outlier threshold.
+    """
+    WINDOW = 100
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expense_stats')
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE, null=True, blank=True)
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
+    count = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)  # sum of squared deviations from the mean
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category} {self.currency}: n={self.count}"
+
+    @property
+    def stdev(self):
+        return (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+    def add(self, amount):
+        delta = amount - self.mean
+        if self.count < self.WINDOW:
+            self.count += 1
+            self.mean += delta / self.count
+            self.m2 += delta * (amount - self.mean)
+            return
+        alpha = 1 / self.WINDOW
+        self.mean += alpha * delta
+        variance = (1 - alpha) * (self.m2 / (self.count - 1) + alpha * delta * delta)
+        self.m2 = variance * (self.count - 1)
+
+    def remove(self, amount):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = amount - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (amount - self.mean), 0.0)
+
+    class Meta:
+        unique_together = ['user', 'category', 'currency']
+
+
+class ExpenseFlag(models.Model):
+    """An expense that looks like a duplicate or an outlier, waiting for review"""
+    DUPLICATE = 'duplicate'
+    OUTLIER = 'outlier'
+    KIND_CHOICES = [(DUPLICATE, 'Possible duplicate'), (OUTLIER, 'Unusual amount')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expense_flags')
+    expense = models.ForeignKey(Expense, on_delete=models.CASCADE, related_name='flags')
+    kind = models.CharField(max_length=9, choices=KIND_CHOICES)
+    duplicate_of = models.ForeignKey(Expense, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    # For outliers: standard deviations above the category mean at the time
+    score = models.FloatField(null=True, blank=True)
+    dismissed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.expense.title} - {self.get_kind_display()}"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', 'dismissed'])]
+
+
+class ChangedMonth(models.Model):
+    """A month with transaction writes since the last cohort job (see budgets.cohorts)"""
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1-12
+
+    def __str__(self):
+        return f"{self.month}/{self.year}"
+
+    @classmethod
+    def mark(cls, *dates):
+        """Queue the months of these dates; already queued months are left alone."""
+        months = {(day.year, day.month) for day in dates}
+        cls.objects.bulk_create(
+            [cls(year=year, month=month) for year, month in months], ignore_conflicts=True,
+        )
+
+    class Meta:
+        unique_together = ['year', 'month']
+
+
+class PlatformMonth(models.Model):
+    """Platform-wide activity in one month, written by the cohort job"""
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1-12
+    # Users with at least one income or expense dated in the month
+    active_users = models.PositiveIntegerField(default=0)
+    new_users = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d}"
+
+    class Meta:
+        ordering = ['-year', '-month']
+        unique_together = ['year', 'month']
+        # Running the cohort job from the admin scans every user's transactions
+        permissions = [('recompute_platformmonth', 'Can recompute platform cohorts')]
+
+
+class PlatformCategoryMonth(models.Model):
+    """Platform-wide totals per month, kind, category and currency, written by the cohort job
+
+    ``label`` is the category name for expenses (split expenses by their
+    lines) and empty for incomes, as in MonthlyRollup.
+    """
+    INCOME = 'income'
+    EXPENSE = 'expense'
+    KIND_CHOICES = [(INCOME, 'Income'), (EXPENSE, 'Expense')]
+
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1-12
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    label = models.CharField(max_length=50, blank=True)
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
+    total = models.DecimalField(max_digits=16, decimal_places=2)
+    count = models.PositiveIntegerField(default=0)
+    users = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} - {self.kind} {self.label} {self.currency}"
+
+    class Meta:
+        ordering = ['-year', '-month', 'kind', '-total']
+        unique_together = ['year', 'month', 'kind', 'label', 'currency']
+
+
+class SavingsGoal(models.Model):
+    """An amount the user wants to have saved by a deadline (see budgets.forecast)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='savings_goals')
+    name = models.CharField(max_length=100)
+    target_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    saved_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default=DEFAULT_CURRENCY)
+    deadline = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.name}"
+
+    class Meta:
+        ordering = ['deadline', 'id']
+        indexes = [models.Index(fields=['user', 'deadline'])]
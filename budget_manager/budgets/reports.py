@@ -0,0 +1,78 @@
+"""Report aggregations shared by the personal and household views."""
+from decimal import Decimal
+
+from django.db.models import QuerySet
+
+from .models import ExpenseSplit, ExpenseTag, MonthlyRollup
+
+
+def category_totals(converter, expenses):
+    """Base-currency totals per category name, counting split expenses by their lines."""
+    totals = converter.totals(expenses.filter(is_split=False), 'category__name')
+    lines = ExpenseSplit.objects.filter(expense__in=expenses.filter(is_split=True))
+    for name, total in converter.totals(lines, 'category__name', prefix='expense__').items():
+        totals[name] = totals.get(name, Decimal('0.00')) + total
+    return totals
+
+
+def tag_totals(converter, user, year):
+    """Base-currency totals per tag for a year, as one grouped query over the through table."""
+    lines = ExpenseTag.objects.filter(tag__user=user, expense__date__year=year)
+    return converter.totals(lines, 'tag__name', amount='expense__amount', prefix='expense__')
+
+
+def as_rows(totals, key='category__name'):
+    """Template rows sorted by total, largest first."""
+    return sorted(
+        ({key: name, 'total': total} for name, total in totals.items()),
+        key=lambda item: item['total'], reverse=True,
+    )
+
+
+def merge_totals(totals, extra):
+    """Add ``extra`` into ``totals`` key by key; returns ``totals``."""
+    for key, total in extra.items():
+        totals[key] = totals.get(key, Decimal('0.00')) + total
+    return totals
+
+
+class ArchivedTotals:
+    """Converted MonthlyRollup totals for one year (or month) of a user, in one query
+
+    ``user`` may also be a queryset of user ids, e.g. a household's members.
+    """
+
+    def __init__(self, converter, user, year, month=None, kinds=None):
+        users = user if isinstance(user, QuerySet) else [user]
+        rollups = MonthlyRollup.objects.filter(user__in=users, year=year)
+        if month is not None:
+            rollups = rollups.filter(month=month)
+        if kinds is not None:
+            rollups = rollups.filter(kind__in=kinds)
+        self.totals = converter.totals(
+            rollups, ('kind', 'month', 'label'), amount='total', period=('year', 'month'),
+        )
+
+    def by_month(self, kind):
+        result = {}
+        for (row_kind, month, _), total in self.totals.items():
+            if row_kind == kind:
+                result[month] = result.get(month, Decimal('0.00')) + total
+        return result
+
+    def by_label(self, kind):
+        """Totals per category or tag name; uncategorised expenses come back as None."""
+        result = {}
+        for (row_kind, _, label), total in self.totals.items():
+            if row_kind == kind:
+                result[label or None] = result.get(label or None, Decimal('0.00')) + total
+        return result
+
+    def total(self, kind):
+        return sum(self.by_month(kind).values(), Decimal('0.00'))
+
+
+def archived_total(converter, user, kind):
+    """All-time base-currency total of a user's archived incomes or expenses."""
+    rollups = MonthlyRollup.objects.filter(user=user, kind=kind)
+    return converter.totals(rollups, amount='total', period=('year', 'month')).get(None, Decimal('0.00'))
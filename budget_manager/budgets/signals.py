@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .anomalies import check_new_expense, update_stats
+from .currency import invalidate_rate_table
+from .live import broker, change_payload, publish_change
+from .models import (
+    ChangedMonth, Income, Expense, DataVersion, ExchangeRate, MonthlyRollup, Tombstone, TransactionYear,
+)
+
+
+# Bulk jobs (budgets.archive) update the year index and data version once at
+# the end instead of per row.
+_suspended = ContextVar('transaction_signals_suspended', default=False)
+
+
+@contextmanager
+def transaction_signals_suspended():
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def _as_date(instance):
+    """Views may assign a POSTed string or timezone.now() to ``date``; normalise it."""
+    return instance._meta.get_field('date').to_python(instance.date)
+
+
+@receiver(post_init, sender=Income)
+@receiver(post_init, sender=Expense)
+def remember_loaded_date(sender, instance, **kwargs):
+    """Keep the date as loaded so moves between years can be detected on save."""
+    # Read __dict__ so querysets using only()/defer() don't fetch the field per row
+    instance._loaded_date = instance.__dict__.get('date') if instance.pk else None
+
+
+@receiver(post_init, sender=Expense)
+def remember_loaded_amount(sender, instance, **kwargs):
+    """Keep what the expense contributed to its ExpenseStats row, to move it on save."""
+    fields = instance.__dict__
+    if instance.pk and all(name in fields for name in ('category_id', 'currency', 'amount')):
+        instance._loaded_stats = (fields['category_id'], fields['currency'], fields['amount'])
+    else:
+        instance._loaded_stats = None
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def queue_changed_month(sender, instance, origin=None, **kwargs):
+    """Queue the row's month, and the one it moved out of, for the cohort job."""
+    # Connected before update_year_index_on_save, which overwrites _loaded_date
+    if _suspended.get() or isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return
+    dates = [_as_date(instance)]
+    if instance._loaded_date is not None:
+        dates.append(instance._meta.get_field('date').to_python(instance._loaded_date))
+    ChangedMonth.mark(*dates)
+
+
+@receiver(post_save, sender=User)
+def queue_signup_month(sender, instance, created, **kwargs):
+    """A signup counts in its month's new users, with or without transactions."""
+    if created:
+        # Same month as cohorts._signups, which extracts it in the current time zone
+        ChangedMonth.mark(timezone.localtime(instance.date_joined))
+
+
+@receiver(pre_delete, sender=User)
+def queue_deleted_user_months(sender, instance, **kwargs):
+    """A deleted account leaves its signup month and every month it had transactions in."""
+    if _suspended.get():
+        return
+    dates = [
+        timezone.localtime(instance.date_joined),
+        *Income.objects.filter(user=instance).dates('date', 'month'),
+        *Expense.objects.filter(user=instance).dates('date', 'month'),
+        *(date(year, month, 1) for year, month in
+          MonthlyRollup.objects.filter(user=instance).values_list('year', 'month').distinct()),
+    ]
+    ChangedMonth.mark(*dates)
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+def update_year_index_on_save(sender, instance, created, **kwargs):
+    if _suspended.get():
+        return
+    date = _as_date(instance)
+    previous = instance._loaded_date
+    if created or previous is None:
+        TransactionYear.record(instance.user_id, date)
+    else:
+        previous = instance._meta.get_field('date').to_python(previous)
+        TransactionYear.refresh(instance.user_id, date.year)
+        if previous.year != date.year:
+            TransactionYear.refresh(instance.user_id, previous.year)
+    instance._loaded_date = date
+
+
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def update_year_index_on_delete(sender, instance, **kwargs):
+    if _suspended.get():
+        return
+    TransactionYear.refresh(instance.user_id, _as_date(instance).year)
+
+
+@receiver(pre_save, sender=Income)
+@receiver(pre_save, sender=Expense)
+def stamp_sync_seq(sender, instance, **kwargs):
+    """Bump the data version (invalidating ETags and per-user caches) and stamp the row with it."""
+    if _suspended.get():
+        return
+    instance.sync_seq = DataVersion.next(instance.user_id)
+
+
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    """Bump the data version and leave a tombstone for sync clients."""
+    if _suspended.get():
+        return
+    if isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        # The whole account is going away, tombstones included
+        return
+    Tombstone.objects.create(
+        user_id=instance.user_id,
+        kind=Tombstone.INCOME if sender is Income else Tombstone.EXPENSE,
+        object_id=instance.pk,
+        sync_seq=DataVersion.next(instance.user_id),
+    )
+
+
+@receiver(post_save, sender=Expense)
+def check_expense(sender, instance, created, **kwargs):
+    """Flag new duplicates/outliers and keep the running amount statistics current."""
+    if _suspended.get():
+        return
+    current = (instance.category_id, instance.currency, instance.amount)
+    if created:
+        check_new_expense(instance, _as_date(instance))
+    elif instance._loaded_stats is not None and instance._loaded_stats != current:
+        update_stats(instance.user_id, removed=instance._loaded_stats, added=current)
+    instance._loaded_stats = current
+
+
+@receiver(post_delete, sender=Expense)
+def drop_expense_stats(sender, instance, origin=None, **kwargs):
+    if _suspended.get() or isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return
+    update_stats(instance.user_id, removed=(instance.category_id, instance.currency, instance.amount))
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def push_live_update(sender, instance, signal, **kwargs):
+    """Send the change to the user's open dashboards once it is committed."""
+    if _suspended.get() or not broker.has_subscribers(instance.user_id):
+        return
+    payload = change_payload(instance, deleted=signal is post_delete)
+    user_id = instance.user_id
+    transaction.on_commit(lambda: publish_change(user_id, payload))
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def drop_cached_rate_table(sender, **kwargs):
+    invalidate_rate_table()
@@ -0,0 +1,220 @@
+"""Delta sync for lightweight clients (see views.api.sync_view).
+
+Every Income/Expense row carries the user's DataVersion at its last write
+(``sync_seq``) and deletions leave a Tombstone with its own sequence number,
+so "everything since N" is three indexed range scans. Client writes arrive in
+batches; each carries an idempotency key and its result is stored in
+SyncWrite, so a retried batch is answered from there instead of applied twice.
+
+Tombstones and SyncWrite rows are pruned after SYNC_RETENTION_DAYS (see
+prune_sync_history). A cursor older than the pruned tombstones gets
+``reset: true`` and no changes; the client then drops its copy and pages
+through a full snapshot with ``full=True``, starting at 0.
+"""
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .currency import CURRENCY_CHOICES, DEFAULT_CURRENCY
+from .models import DataVersion, Expense, ExpenseCategory, Income, SyncWrite, Tombstone
+
+SYNC_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 100
+
+_CURRENCIES = {code for code, _ in CURRENCY_CHOICES}
+
+
+class SyncError(ValueError):
+    """A client write that cannot be applied; reported back per write."""
+
+
+def _income_data(income):
+    return {
+        'id': income.pk,
+        'amount': str(income.amount),
+        'currency': income.currency,
+        'source': income.source,
+        'description': income.description or '',
+        'date': income.date.isoformat(),
+        'seq': income.sync_seq,
+    }
+
+
+def _expense_data(expense):
+    return {
+        'id': expense.pk,
+        'amount': str(expense.amount),
+        'currency': expense.currency,
+        'title': expense.title,
+        'category': expense.category.name if expense.category else None,
+        'description': expense.description or '',
+        'date': expense.date.isoformat(),
+        'seq': expense.sync_seq,
+    }
+
+
+def changes_since(user, since=0, limit=SYNC_PAGE_SIZE, full=False):
+    """Changes with a sequence number above ``since``, oldest first, at most ``limit``.
+
+    Each table is read ``limit + 1`` rows deep, which is enough to know both
+    the first ``limit`` changes overall and whether there are more.
+
+    ``seq`` in the result is the cursor for the next call; ``more`` says
+    whether another page is waiting. ``full`` pages through a snapshot being
+    rebuilt from scratch, which needs no tombstones.
+    """
+    pruned_seq = DataVersion.for_user(user.pk).pruned_seq
+    if not full and 0 < since < pruned_seq:
+        return {'incomes': [], 'expenses': [], 'deleted': [], 'more': False, 'reset': True, 'seq': 0}
+    incomes = list(
+        Income.objects.filter(user=user, sync_seq__gt=since).order_by('sync_seq')[:limit + 1]
+    )
+    expenses = list(
+        Expense.objects.filter(user=user, sync_seq__gt=since)
+        .select_related('category').order_by('sync_seq')[:limit + 1]
+    )
+    tombstones = [] if full else list(
+        Tombstone.objects.filter(user=user, sync_seq__gt=since).order_by('sync_seq')[:limit + 1]
+    )
+    changes = sorted(
+        [('income', row.sync_seq, row) for row in incomes]
+        + [('expense', row.sync_seq, row) for row in expenses]
+        + [('deleted', row.sync_seq, row) for row in tombstones],
+        key=lambda change: change[1],
+    )
+    more = len(changes) > limit
+    changes = changes[:limit]
+
+    result = {'incomes': [], 'expenses': [], 'deleted': [], 'more': more, 'reset': False}
+    for kind, _, row in changes:
+        if kind == 'income':
+            result['incomes'].append(_income_data(row))
+        elif kind == 'expense':
+            result['expenses'].append(_expense_data(row))
+        else:
+            result['deleted'].append({'type': row.kind, 'id': row.object_id, 'seq': row.sync_seq})
+    result['seq'] = changes[-1][1] if changes else max(since, 0)
+    if full and not more:
+        # The snapshot holds every live row, so the pruned deletes are behind it
+        result['seq'] = max(result['seq'], pruned_seq)
+    return result
+
+
+def _clean_fields(kind, data, partial):
+    """Validated model field values from a client payload."""
+    fields = {}
+    if 'amount' in data or not partial:
+        try:
+            fields['amount'] = Decimal(str(data['amount'])).quantize(Decimal('0.01'))
+        except (KeyError, InvalidOperation):
+            raise SyncError('amount must be a number')
+    if 'currency' in data or not partial:
+        currency = data.get('currency', DEFAULT_CURRENCY)
+        if not isinstance(currency, str) or currency not in _CURRENCIES:
+            raise SyncError(f'unsupported currency {currency}')
+        fields['currency'] = currency
+    if 'date' in data or not partial:
+        try:
+            fields['date'] = date.fromisoformat(data['date'])
+        except (KeyError, TypeError, ValueError):
+            raise SyncError('date must be YYYY-MM-DD')
+    if 'description' in data:
+        fields['description'] = str(data['description'] or '')
+
+    name_field = 'source' if kind == 'income' else 'title'
+    if name_field in data or not partial:
+        if not data.get(name_field):
+            raise SyncError(f'{name_field} is required')
+        fields[name_field] = str(data[name_field])[:200]
+    if kind == 'expense' and ('category' in data or not partial):
+        category = None
+        if data.get('category'):
+            if not isinstance(data['category'], str):
+                raise SyncError('category must be a name')
+            category = ExpenseCategory.objects.filter(name=data['category']).first()
+            if category is None:
+                raise SyncError(f"unknown category {data['category']}")
+        fields['category'] = category
+    return fields
+
+
+def _apply(user, write):
+    kind = write.get('type')
+    if kind not in ('income', 'expense'):
+        raise SyncError('type must be income or expense')
+    model = Income if kind == 'income' else Expense
+    data = write.get('data') or {}
+    if not isinstance(data, dict):
+        raise SyncError('data must be an object')
+    op = write.get('op')
+    if op == 'create':
+        obj = model.objects.create(user=user, **_clean_fields(kind, data, partial=False))
+        return {'id': obj.pk, 'seq': obj.sync_seq}
+
+    if op not in ('update', 'delete'):
+        raise SyncError('op must be create, update or delete')
+    if type(write.get('id')) is not int:
+        raise SyncError('id must be an integer')
+    obj = model.objects.filter(user=user, pk=write['id']).first()
+    if op == 'update':
+        if obj is None:
+            raise SyncError('not found')
+        fields = _clean_fields(kind, data, partial=True)
+        if getattr(obj, 'is_split', False) and ('amount' in fields or 'currency' in fields):
+            # The split lines must keep adding up to the amount; they are edited in the app
+            raise SyncError('amount and currency of a split expense cannot be changed')
+        for field, value in fields.items():
+            setattr(obj, field, value)
+        obj.save()
+        return {'id': obj.pk, 'seq': obj.sync_seq}
+    # Deleting twice (or something already gone) is not an error for an offline client
+    if obj is not None:
+        obj.delete()
+    return {'id': write['id']}
+
+
+def apply_writes(user, writes):
+    """Apply a batch of client writes; returns one result per write, in order."""
+    keys = [write.get('key') for write in writes]
+    valid = [k for k in keys if isinstance(k, str) and 0 < len(k) <= 64]
+    done = dict(SyncWrite.objects.filter(user=user, key__in=valid).values_list('key', 'result'))
+
+    results = []
+    for key, write in zip(keys, writes):
+        if not isinstance(key, str) or not key or len(key) > 64:
+            results.append({'key': key, 'status': 'error', 'error': 'key must be a string of 1 to 64 characters'})
+            continue
+        if key in done:
+            results.append(done[key])
+            continue
+        try:
+            with transaction.atomic():
+                result = {'key': key, 'status': 'ok', **_apply(user, write)}
+                SyncWrite.objects.create(user=user, key=key, result=result)
+        except SyncError as exc:
+            result = {'key': key, 'status': 'error', 'error': str(exc)}
+        done[key] = result
+        results.append(result)
+    return results, DataVersion.for_user(user.pk).version
+
+
+def prune_sync_history(now=None):
+    """Delete tombstones and SyncWrite records older than SYNC_RETENTION_DAYS.
+
+    Each user's DataVersion.pruned_seq is raised to their newest deleted
+    tombstone first, so cursors that still needed one are sent to a full resync.
+    Returns (tombstones, sync writes) deleted.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SYNC_RETENTION_DAYS)
+    old = Tombstone.objects.filter(deleted_at__lt=cutoff)
+    with transaction.atomic():
+        floors = old.values('user_id').annotate(seq=Max('sync_seq')).order_by()
+        for row in floors:
+            DataVersion.objects.filter(user_id=row['user_id'], pruned_seq__lt=row['seq']).update(pruned_seq=row['seq'])
+        tombstones = old.delete()[0]
+        writes = SyncWrite.objects.filter(created_at__lt=cutoff).delete()[0]
+    return tombstones, writes
@@ -1,3 +1,1000 @@
-from django.test import TestCase
+import asyncio
+import base64
+import io
+import json
+import zlib
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.db import connection, connections
+from django.utils import timezone
+
+from .models import (
+    ChangedMonth, Income, Expense, ExpenseCategory, ExpenseSplit, Household, HouseholdMembership, MonthlyRollup,
+    PlatformCategoryMonth, PlatformMonth, SavingsGoal, Tag,
+)
+
+
+@override_settings(MIDDLEWARE=settings.PRODUCTION_MIDDLEWARE + settings.MIDDLEWARE)
+class ProductionResponseProfileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret-pass-1')
+        category = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        today = date.today()
+        Income.objects.create(user=self.user, amount=Decimal('50000'), source='Salary', date=today)
+        for i in range(20):
+            Expense.objects.create(
+                user=self.user, category=category, amount=Decimal('100') + i,
+                title=f'Trip {i}', date=today,
+            )
+        self.client.force_login(self.user)
+
+    def test_dashboard_bytes_transferred(self):
+        plain = self.client.get('/dashboard/')
+        gzipped = self.client.get('/dashboard/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertLess(len(gzipped.content), len(plain.content) / 3)
+
+        revalidated = self.client.get(
+            '/dashboard/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=plain['ETag'],
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(len(revalidated.content), 0)
+
+    def test_etag_changes_when_data_changes(self):
+        first = self.client.get('/dashboard/')
+        self.assertIn('private', first['Cache-Control'])
+        Expense.objects.create(user=self.user, amount=Decimal('5'), title='Coffee', date=date.today())
+        second = self.client.get('/dashboard/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_lists_render_each_row_once(self):
+        response = self.client.get('/expenses/')
+        for expense in Expense.objects.filter(user=self.user):
+            self.assertContains(response, f'/expense/delete/{expense.id}/', count=1)
+        income = Income.objects.get(user=self.user)
+        self.assertContains(self.client.get('/incomes/'), f'/income/delete/{income.id}/', count=1)
+
+    def test_cached_nav_has_no_user_specific_markup(self):
+        from django.core.cache.utils import make_template_fragment_key
+
+        key = make_template_fragment_key('app_nav', ['dashboard'])
+        cache.delete(key)
+        self.client.get('/dashboard/')
+        fragment = cache.get(key)
+        self.assertIn('sidebar-nav', fragment)
+        self.assertNotIn(self.user.username, fragment)
+        self.assertNotIn('csrfmiddlewaretoken', fragment)
+
+        # The same fragment rendered for someone else is byte for byte identical
+        other = User.objects.create_user('zoltan', password='secret-pass-1')
+        self.client.force_login(other)
+        cache.delete(key)
+        self.client.get('/dashboard/')
+        self.assertEqual(cache.get(key), fragment)
+
+    def test_pdf_is_private_and_not_gzipped(self):
+        response = self.client.get('/monthly-report/download/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+
+class TransactionYearTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('olga', password='secret-pass-1')
+        self.client.force_login(self.user)
+
+    def years(self):
+        return self.client.get('/yearly-report/2024/').context['available_years']
+
+    def test_income_only_year_is_listed(self):
+        Income.objects.create(user=self.user, amount=Decimal('100'), source='Pay', date=date(2019, 6, 1))
+        Expense.objects.create(user=self.user, amount=Decimal('10'), title='Bus', date=date(2024, 1, 1))
+        self.assertEqual(self.years(), [2019, 2024])
+        self.assertContains(self.client.get('/yearly-report/2024/'), '<option value="2019"')
+
+    def test_moving_an_expense_to_another_year(self):
+        Expense.objects.create(user=self.user, amount=Decimal('10'), title='Bus', date=date(2024, 1, 1))
+        moved = Expense.objects.create(user=self.user, amount=Decimal('20'), title='Train', date=date(2024, 3, 1))
+        moved.date = date(2022, 3, 1)
+        moved.save()
+        self.assertEqual(self.years(), [2022, 2024])
+        # Moving the last row out of a year drops that year
+        moved.date = date(2023, 3, 1)
+        moved.save()
+        self.assertEqual(self.years(), [2023, 2024])
+
+    def test_deleting_the_last_row_of_a_year(self):
+        Expense.objects.create(user=self.user, amount=Decimal('10'), title='Bus', date=date(2024, 1, 1))
+        old = Income.objects.create(user=self.user, amount=Decimal('100'), source='Pay', date=date(2021, 6, 1))
+        self.assertEqual(self.years(), [2021, 2024])
+        self.client.post(f'/income/delete/{old.id}/')
+        self.assertEqual(self.years(), [2024])
+
+
+class MultiCurrencyReportTests(TestCase):
+    def setUp(self):
+        from accounts.models import Profile
+        from .models import ExchangeRate
+
+        self.user = User.objects.create_user('dana', password='secret-pass-1')
+        Profile.objects.create(user=self.user, base_currency='INR')
+        ExchangeRate.objects.create(currency='USD', year=2024, month=1, rate=Decimal('80'))
+        ExchangeRate.objects.create(currency='USD', year=2024, month=3, rate=Decimal('85'))
+        ExchangeRate.objects.create(currency='EUR', year=2024, month=1, rate=Decimal('90'))
+        food = ExpenseCategory.objects.create(name=ExpenseCategory.EATING_OUT)
+        travel = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        Income.objects.create(user=self.user, amount=Decimal('1000'), currency='USD', source='Pay', date=date(2024, 2, 1))
+        Expense.objects.create(user=self.user, amount=Decimal('500'), title='Dinner', category=food, date=date(2024, 2, 3))
+        Expense.objects.create(user=self.user, amount=Decimal('10'), currency='USD', title='Taxi', category=travel, date=date(2024, 3, 5))
+        Expense.objects.create(user=self.user, amount=Decimal('10'), currency='EUR', title='Train', category=travel, date=date(2024, 3, 6))
+        self.client.force_login(self.user)
+
+    def test_yearly_report_converts_with_monthly_rates(self):
+        # Split lines and per-tag totals add one grouped query each
+        with self.assertNumQueries(10):
+            response = self.client.get('/yearly-report/2024/')
+        # February has no USD rate of its own and falls back to January's
+        self.assertEqual(response.context['yearly_income'], Decimal('80000.00'))
+        # 500 INR + 10 USD @ 85 + 10 EUR @ 90 (latest known EUR rate)
+        self.assertEqual(response.context['yearly_expenses'], Decimal('2250.00'))
+        by_category = {row['category__name']: row['total'] for row in response.context['expenses_by_category']}
+        self.assertEqual(by_category, {'travel': Decimal('1750.00'), 'eating_out': Decimal('500.00')})
+
+    def test_usd_base_currency(self):
+        self.user.profile.base_currency = 'USD'
+        self.user.profile.save()
+        response = self.client.get('/dashboard/?month=3&year=2024')
+        self.assertEqual(response.context['total_expenses'], Decimal('20.59'))
+        self.assertEqual(response.context['currency_symbol'], '$')
+
+    def test_missing_rate_is_left_out_and_flagged(self):
+        category = ExpenseCategory.objects.get(name=ExpenseCategory.TRAVEL)
+        Expense.objects.create(user=self.user, amount=Decimal('10'), currency='GBP', title='Tube', category=category, date=date(2024, 3, 7))
+        response = self.client.get('/yearly-report/2024/')
+        self.assertEqual(response.context['yearly_expenses'], Decimal('2250.00'))
+        self.assertContains(response, 'No GBP to INR exchange rate for 2024-03')
+
+    def test_rate_import_changes_etag_and_forecast_key(self):
+        import tempfile
+
+        from django.core.management import call_command
+
+        from .currency import RateConverter
+
+        first = self.client.get('/dashboard/')
+        old_version = RateConverter('INR').version
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as fh:
+            fh.write('month,currency,rate\n2024-02,USD,82\n')
+            fh.flush()
+            call_command('import_exchange_rates', fh.name, stdout=io.StringIO())
+        self.assertNotEqual(RateConverter('INR').version, old_version)
+        second = self.client.get('/dashboard/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(self.client.get('/yearly-report/2024/').context['yearly_income'], Decimal('82000.00'))
+
+
+    def test_rate_version_is_the_same_in_every_worker(self):
+        from .currency import RATE_TABLE_CACHE_KEY, RateConverter
+        from .models import ExchangeRate
+
+        first = RateConverter('INR').version
+        cache.delete(RATE_TABLE_CACHE_KEY)  # another worker builds its own copy
+        self.assertEqual(RateConverter('INR').version, first)
+        rate = ExchangeRate.objects.get(currency='EUR')
+        rate.rate = Decimal('91')
+        rate.save()
+        self.assertNotEqual(RateConverter('INR').version, first)
+
+    @override_settings(RATE_TABLE_CACHE_SECONDS=60)
+    def test_rate_table_cache_is_bounded(self):
+        from .currency import RATE_TABLE_CACHE_KEY, get_rate_table
+
+        cache.delete(RATE_TABLE_CACHE_KEY)
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            get_rate_table()
+        cache_set.assert_called_once_with(RATE_TABLE_CACHE_KEY, mock.ANY, 60)
+
+
+class HouseholdReportTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('erin', password='secret-pass-1')
+        self.household = Household.objects.create(name='Home', owner=self.owner)
+        self.category = ExpenseCategory.objects.create(name=ExpenseCategory.BILLS_RENT)
+        self.add_member(self.owner)
+        self.client.force_login(self.owner)
+
+    def add_member(self, user):
+        HouseholdMembership.objects.create(household=self.household, user=user, accepted_at=timezone.now())
+        Income.objects.create(user=user, amount=Decimal('1000'), source='Pay', date=date(2024, 5, 1))
+        Expense.objects.create(
+            user=user, household=self.household, category=self.category,
+            amount=Decimal('300'), title='Rent share', date=date(2024, 5, 2),
+        )
+        # Personal expenses stay out of the household report
+        Expense.objects.create(user=user, amount=Decimal('50'), title='Lunch', date=date(2024, 5, 3))
+
+    def query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_totals_and_split(self):
+        frank = User.objects.create_user('frank', password='secret-pass-1')
+        self.add_member(frank)
+        Expense.objects.create(
+            user=frank, household=self.household, category=self.category,
+            amount=Decimal('200'), title='Power', date=date(2024, 5, 9),
+        )
+        response = self.client.get(f'/households/{self.household.id}/?month=5&year=2024')
+        self.assertEqual(response.context['total_income'], Decimal('2000.00'))
+        self.assertEqual(response.context['total_expenses'], Decimal('800.00'))
+        balances = {s['username']: s['balance'] for s in response.context['member_shares']}
+        self.assertEqual(balances, {'erin': Decimal('-100.00'), 'frank': Decimal('100.00')})
+
+    def test_query_count_does_not_grow_with_members(self):
+        urls = [f'/households/{self.household.id}/?month=5&year=2024', f'/households/{self.household.id}/yearly-report/2024/']
+        for url in urls:
+            self.query_count(url)
+        before = [self.query_count(url)[0] for url in urls]
+        for i in range(5):
+            self.add_member(User.objects.create_user(f'member{i}', password='secret-pass-1'))
+        after = [self.query_count(url)[0] for url in urls]
+        self.assertEqual(before, after)
+
+    def test_create_household_and_share_expense(self):
+        self.client.post('/households/', {'name': 'Flat', 'currency': 'USD'})
+        flat = Household.objects.get(name='Flat')
+        self.assertContains(self.client.get('/households/'), 'Flat')
+        self.assertContains(self.client.get('/add-expense/'), 'Shared With')
+        self.client.post('/add-expense/', {
+            'amount': '5', 'title': 'Tickets', 'category': self.category.id,
+            'household': flat.id, 'date': '2024-01-01', 'currency': 'USD',
+        })
+        self.assertEqual(Expense.objects.get(title='Tickets').household, flat)
+        self.assertEqual(self.client.get(f'/households/{flat.id}/yearly-report/').status_code, 200)
+        self.assertContains(self.client.get(f'/households/{flat.id}/?month=1&year=2024'), '$5')
+
+    def test_invited_member_income_counts_only_after_accepting(self):
+        frank = User.objects.create_user('frank', password='secret-pass-1')
+        Income.objects.create(user=frank, amount=Decimal('1000'), source='Pay', date=date(2024, 5, 1))
+        self.client.post(f'/households/{self.household.id}/members/add/', {'username': 'frank'})
+        url = f'/households/{self.household.id}/?month=5&year=2024'
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_income'], Decimal('1000.00'))
+        self.assertEqual([s['username'] for s in response.context['member_shares']], ['erin'])
+        yearly = self.client.get(f'/households/{self.household.id}/yearly-report/2024/')
+        self.assertEqual(yearly.context['yearly_income'], Decimal('1000.00'))
+
+        # Pending invitees can't open the household or share expenses into it
+        self.client.force_login(frank)
+        self.assertContains(self.client.get('/households/'), 'invited you')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.post('/add-expense/', {
+            'amount': '5', 'title': 'Sneaky', 'category': self.category.id,
+            'household': self.household.id, 'date': '2024-05-01',
+        })
+        self.assertEqual(response.status_code, 404)
+
+        self.client.post(f'/households/{self.household.id}/accept/')
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get(url).context['total_income'], Decimal('2000.00'))
+
+    def test_declining_removes_invitation(self):
+        frank = User.objects.create_user('frank', password='secret-pass-1')
+        self.client.post(f'/households/{self.household.id}/members/add/', {'username': 'frank'})
+        self.client.force_login(frank)
+        self.client.post(f'/households/{self.household.id}/leave/')
+        self.assertFalse(HouseholdMembership.objects.filter(user=frank).exists())
+
+    def test_non_member_gets_404(self):
+        outsider = User.objects.create_user('mallory', password='secret-pass-1')
+        self.client.force_login(outsider)
+        response = self.client.get(f'/households/{self.household.id}/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TagsAndSplitsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('erin', password='secret-pass-1')
+        self.food = ExpenseCategory.objects.create(name=ExpenseCategory.EATING_OUT)
+        self.travel = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        self.client.force_login(self.user)
+
+    def add_expense(self, amount, splits=(), tags=''):
+        return self.client.post('/add-expense/', {
+            'amount': amount, 'title': 'Trip', 'category': self.food.id, 'date': '2024-05-04',
+            'split_category': [category.id for category, _ in splits],
+            'split_amount': [line_amount for _, line_amount in splits],
+            'tags': tags,
+        })
+
+    def test_reports_aggregate_split_lines(self):
+        self.add_expense('300', splits=[(self.food, '100'), (self.travel, '200')], tags='Goa, goa , work')
+        self.add_expense('50', tags='goa')
+        expense = Expense.objects.get(amount=Decimal('300'))
+        self.assertTrue(expense.is_split)
+        self.assertEqual(expense.category, self.travel)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+        response = self.client.get('/yearly-report/2024/')
+        by_category = {row['category__name']: row['total'] for row in response.context['expenses_by_category']}
+        self.assertEqual(by_category, {'travel': Decimal('200.00'), 'eating_out': Decimal('150.00')})
+        by_tag = {row['tag__name']: row['total'] for row in response.context['expenses_by_tag']}
+        self.assertEqual(by_tag, {'Goa': Decimal('350.00'), 'work': Decimal('300.00')})
+
+        response = self.client.get('/dashboard/?month=5&year=2024')
+        self.assertEqual(response.context['total_expenses'], Decimal('350.00'))
+
+    def test_split_lines_must_add_up(self):
+        response = self.add_expense('300', splits=[(self.food, '100'), (self.travel, '100')])
+        self.assertRedirects(response, '/add-expense/', fetch_redirect_response=False)
+        self.assertFalse(Expense.objects.exists())
+
+    def test_malformed_split_line_is_rejected(self):
+        for category_id, line_amount in [('abc', '300'), (self.food.id, 'ten')]:
+            response = self.client.post('/add-expense/', {
+                'amount': '300', 'title': 'Trip', 'category': self.food.id, 'date': '2024-05-04',
+                'split_category': [category_id], 'split_amount': [line_amount],
+            }, follow=True)
+            self.assertContains(response, 'Each split line needs a category and a valid amount.')
+        self.assertFalse(Expense.objects.exists())
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRoutingTests(TransactionTestCase):
+    # The replica mirrors the test database through a second connection, which
+    # only sees committed rows, hence TransactionTestCase.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('frank', password='secret-pass-1')
+        self.category = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        Expense.objects.create(user=self.user, amount=Decimal('10'), title='Bus', category=self.category, date=date(2024, 1, 2))
+        self.client.force_login(self.user)
+
+    def get_report(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            self.client.get('/yearly-report/2024/')
+        budgets_on_primary = [q['sql'] for q in primary.captured_queries if 'budgets_' in q['sql']]
+        return budgets_on_primary, len(replica.captured_queries)
+
+    def test_report_reads_go_to_replica(self):
+        budgets_on_primary, replica_queries = self.get_report()
+        self.assertEqual(budgets_on_primary, [])
+        self.assertGreater(replica_queries, 0)
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        self.client.post('/add-expense/', {
+            'amount': '5', 'title': 'Tea', 'category': self.category.id, 'date': '2024-01-03',
+        })
+        budgets_on_primary, replica_queries = self.get_report()
+        self.assertEqual(replica_queries, 0)
+        self.assertTrue(budgets_on_primary)
+
+    def test_delete_is_post_only_and_sticks_to_primary(self):
+        expense = Expense.objects.get()
+        self.client.get(f'/expense/delete/{expense.id}/')
+        self.assertTrue(Expense.objects.filter(id=expense.id).exists())
+        self.client.post(f'/expense/delete/{expense.id}/')
+        self.assertFalse(Expense.objects.filter(id=expense.id).exists())
+        budgets_on_primary, replica_queries = self.get_report()
+        self.assertEqual(replica_queries, 0)
+        self.assertTrue(budgets_on_primary)
+
+    def test_forms_and_writes_use_primary(self):
+        from budget_manager.db_router import ReplicaRouter, replica_reads
+
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.client.get('/add-expense/')
+        self.assertEqual(len(replica.captured_queries), 0)
+        with replica_reads(self.user.pk):
+            self.assertEqual(ReplicaRouter().db_for_read(Expense), 'replica')
+            self.assertEqual(ReplicaRouter().db_for_read(User), 'default')
+            self.assertEqual(ReplicaRouter().db_for_write(Expense), 'default')
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica_configured(self):
+        budgets_on_primary, replica_queries = self.get_report()
+        self.assertEqual(replica_queries, 0)
+        self.assertTrue(budgets_on_primary)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('gina', password='secret-pass-1')
+        self.food = ExpenseCategory.objects.create(name=ExpenseCategory.EATING_OUT)
+        self.travel = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        self.client.force_login(self.user)
+        Income.objects.create(user=self.user, amount=Decimal('1000'), source='Pay', date=date(2020, 3, 1))
+        Expense.objects.create(user=self.user, amount=Decimal('40'), title='Lunch', category=self.food, date=date(2020, 3, 2))
+        self.client.post('/add-expense/', {
+            'amount': '300', 'title': 'Trip', 'category': self.food.id, 'date': '2020-04-04',
+            'split_category': [self.food.id, self.travel.id], 'split_amount': ['100', '200'],
+            'tags': 'goa',
+        })
+        Expense.objects.create(user=self.user, amount=Decimal('25'), title='Recent', category=self.food, date=date.today())
+
+    def report(self, year=2020):
+        context = self.client.get(f'/yearly-report/{year}/').context
+        return (
+            context['yearly_income'],
+            [(row['month'], row['income'], row['expenses']) for row in context['monthly_data']],
+            {row['category__name']: row['total'] for row in context['expenses_by_category']},
+            {row['tag__name']: row['total'] for row in context['expenses_by_tag']},
+        )
+
+    def test_reports_are_unchanged_by_archiving(self):
+        from .archive import archive_all
+        from .models import ArchivedTransaction, TransactionYear
+
+        before = self.report()
+        dashboard = self.client.get('/dashboard/?month=4&year=2020').context['total_expenses']
+        self.assertEqual(archive_all(months=12), (1, 3))
+
+        self.assertFalse(Expense.objects.filter(date__year=2020).exists())
+        self.assertEqual(Expense.objects.count(), 1)
+        self.assertEqual(ArchivedTransaction.objects.count(), 3)
+        self.assertTrue(TransactionYear.objects.get(user=self.user, year=2020).archived)
+        self.assertEqual(self.report(), before)
+        self.assertEqual(self.client.get('/dashboard/?month=4&year=2020').context['total_expenses'], dashboard)
+        self.assertEqual(self.client.get('/expenses/').context['total_expenses'], Decimal('365.00'))
+
+        # Back-dated entries are merged into the existing rollups on the next run
+        Expense.objects.create(user=self.user, amount=Decimal('10'), title='Snack', category=self.food, date=date(2020, 3, 9))
+        self.assertEqual(archive_all(months=12), (1, 1))
+        by_category = self.report()[2]
+        self.assertEqual(by_category, {'travel': Decimal('200.00'), 'eating_out': Decimal('150.00')})
+
+    def test_sync_clients_see_archived_rows_as_deleted(self):
+        from .archive import archive_all
+        from .models import DataVersion
+
+        since = self.client.get('/api/sync/').json()['seq']
+        archived = {('income', pk) for pk in Income.objects.filter(date__year=2020).values_list('pk', flat=True)}
+        archived |= {('expense', pk) for pk in Expense.objects.filter(date__year=2020).values_list('pk', flat=True)}
+        archive_all(months=12)
+        delta = self.client.get('/api/sync/', {'since': since}).json()
+        self.assertEqual({(row['type'], row['id']) for row in delta['deleted']}, archived)
+        self.assertEqual(len(archived), 3)
+        self.assertEqual(delta['seq'], DataVersion.for_user(self.user.pk).version)
+
+    def test_household_reports_and_pdf_include_archived_months(self):
+        from .archive import archive_all
+
+        household = Household.objects.create(name='Home', owner=self.user)
+        HouseholdMembership.objects.create(household=household, user=self.user, accepted_at=timezone.now())
+        archive_all(months=12)
+        response = self.client.get(f'/households/{household.id}/?month=3&year=2020')
+        self.assertEqual(response.context['total_income'], Decimal('1000.00'))
+        response = self.client.get(f'/households/{household.id}/yearly-report/2020/')
+        self.assertEqual(response.context['yearly_income'], Decimal('1000.00'))
+        self.assertEqual(response.context['monthly_data'][2]['income'], Decimal('1000.00'))
+
+        pdf = self.client.get('/monthly-report/download/?month=3&year=2020').content
+        page = zlib.decompress(base64.a85decode(pdf.split(b'>>\nstream\n')[1].split(b'endstream')[0], adobe=True))
+        self.assertIn(b'Archived incomes', page)
+        self.assertIn(b'Archived expenses', page)
+        self.assertIn(b'960.00', page)  # balance: 1000 income, 40 expenses
+
+    def test_hot_years_skip_the_rollups(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/yearly-report/{date.today().year}/')
+        self.assertFalse(any('budgets_monthlyrollup' in q['sql'] for q in queries.captured_queries))
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('hana', password='secret-pass-1')
+        ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        self.client.force_login(self.user)
+
+    def pull(self, since=0, **params):
+        return self.client.get('/api/sync/', {'since': since, **params}).json()
+
+    def push(self, *writes):
+        return self.client.post('/api/sync/', {'writes': list(writes)}, content_type='application/json').json()
+
+    def test_round_trip_with_tombstones(self):
+        Income.objects.create(user=self.user, amount=Decimal('100'), source='Pay', date=date(2024, 1, 1))
+        snapshot = self.pull()
+        self.assertEqual(len(snapshot['incomes']), 1)
+
+        created = self.push({
+            'key': 'k1', 'type': 'expense', 'op': 'create',
+            'data': {'amount': '12.50', 'title': 'Bus', 'category': 'travel', 'date': '2024-01-02'},
+        })['results'][0]
+        self.assertEqual(created['status'], 'ok')
+        self.push({'key': 'k2', 'type': 'expense', 'op': 'update', 'id': created['id'], 'data': {'amount': '15'}})
+
+        delta = self.pull(snapshot['seq'])
+        self.assertEqual([e['amount'] for e in delta['expenses']], ['15.00'])
+        self.assertEqual(delta['incomes'], [])
+
+        self.push({'key': 'k3', 'type': 'expense', 'op': 'delete', 'id': created['id']})
+        delta = self.pull(delta['seq'])
+        self.assertEqual(delta['deleted'], [{'type': 'expense', 'id': created['id'], 'seq': delta['seq']}])
+        self.assertEqual(self.pull(delta['seq'])['seq'], delta['seq'])
+
+    def test_retried_writes_are_applied_once(self):
+        write = {'key': 'retry-me', 'type': 'income', 'op': 'create',
+                 'data': {'amount': '5', 'source': 'Gift', 'date': '2024-02-01'}}
+        first = self.push(write)
+        second = self.push(write, {'key': 'bad', 'type': 'income', 'op': 'create', 'data': {'amount': 'x'}})
+        self.assertEqual(second['results'][0], first['results'][0])
+        self.assertEqual(second['results'][1]['status'], 'error')
+        self.assertEqual(Income.objects.count(), 1)
+
+    def test_malformed_writes_fail_one_by_one(self):
+        income = {'amount': '5', 'source': 'Gift', 'date': '2024-02-01'}
+        results = self.push(
+            {'key': 7, 'type': 'income', 'op': 'create', 'data': income},
+            {'key': ['a'], 'type': 'income', 'op': 'create', 'data': income},
+            {'key': {'a': 1}, 'type': 'income', 'op': 'create', 'data': income},
+            {'key': 'list-data', 'type': 'income', 'op': 'create', 'data': ['amount', '5']},
+            {'key': 'bad-id', 'type': 'income', 'op': 'update', 'id': {'pk': 1}, 'data': {}},
+            {'key': 'bad-currency', 'type': 'income', 'op': 'create', 'data': {**income, 'currency': ['USD']}},
+            {'key': 'bad-category', 'type': 'expense', 'op': 'create',
+             'data': {'amount': '5', 'title': 'Bus', 'date': '2024-02-01', 'category': ['travel']}},
+            {'key': 'good', 'type': 'income', 'op': 'create', 'data': income},
+        )['results']
+        self.assertEqual([r['status'] for r in results], ['error'] * 7 + ['ok'])
+        self.assertEqual(Income.objects.count(), 1)
+
+    def test_split_expense_amount_cannot_change(self):
+        travel = ExpenseCategory.objects.get(name=ExpenseCategory.TRAVEL)
+        food = ExpenseCategory.objects.create(name=ExpenseCategory.EATING_OUT)
+        self.client.post('/add-expense/', {
+            'amount': '30', 'title': 'Trip', 'category': travel.id, 'date': '2024-04-04',
+            'split_category': [travel.id, food.id], 'split_amount': ['20', '10'],
+        })
+        expense = Expense.objects.get(title='Trip')
+        results = self.push(
+            {'key': 'amount', 'type': 'expense', 'op': 'update', 'id': expense.id, 'data': {'amount': '50'}},
+            {'key': 'currency', 'type': 'expense', 'op': 'update', 'id': expense.id, 'data': {'currency': 'USD'}},
+            {'key': 'title', 'type': 'expense', 'op': 'update', 'id': expense.id, 'data': {'title': 'Goa trip'}},
+        )['results']
+        self.assertEqual([r['status'] for r in results], ['error', 'error', 'ok'])
+        expense.refresh_from_db()
+        self.assertEqual((expense.amount, expense.currency, expense.title), (Decimal('30.00'), 'INR', 'Goa trip'))
+
+    def test_cursor_older_than_pruned_tombstones_resyncs(self):
+        from datetime import timedelta
+
+        from .sync import prune_sync_history
+
+        keep = Income.objects.create(user=self.user, amount=Decimal('1'), source='Keep', date=date(2024, 1, 1))
+        gone = Income.objects.create(user=self.user, amount=Decimal('2'), source='Gone', date=date(2024, 1, 1))
+        cursor = self.pull()['seq']
+        self.push({'key': 'old', 'type': 'income', 'op': 'update', 'id': keep.id, 'data': {'source': 'Kept'}})
+        gone.delete()
+        later = timezone.now() + timedelta(days=settings.SYNC_RETENTION_DAYS + 1)
+        self.assertEqual(prune_sync_history(later), (1, 1))
+
+        self.assertTrue(self.pull(cursor)['reset'])
+        pages, since, more = [], 0, True
+        while more:
+            page = self.pull(since, limit=1, full=1)
+            self.assertFalse(page['reset'])
+            pages += [income['source'] for income in page['incomes']]
+            since, more = page['seq'], page['more']
+        self.assertEqual(pages, ['Kept'])
+        # Fresh cursors are unaffected
+        self.assertFalse(self.pull(since)['reset'])
+
+    def test_pages_follow_the_sequence(self):
+        for i in range(5):
+            Expense.objects.create(user=self.user, amount=Decimal(i + 1), title=f'E{i}', date=date(2024, 1, 1))
+        seen, since, more = [], 0, True
+        while more:
+            page = self.pull(since, limit=2)
+            seen += [e['title'] for e in page['expenses']]
+            since, more = page['seq'], page['more']
+        self.assertEqual(seen, ['E0', 'E1', 'E2', 'E3', 'E4'])
+
+
+class SyncSequenceTests(TransactionTestCase):
+    def test_seq_bump_rolls_back_with_a_failed_write(self):
+        from django.db.models.signals import pre_save
+
+        from .models import DataVersion
+
+        user = User.objects.create_user('hana', password='secret-pass-1')
+        Income.objects.create(user=user, amount=Decimal('1'), source='Pay', date=date(2024, 1, 1))
+        version = DataVersion.for_user(user.pk).version
+
+        def fail(sender, **kwargs):
+            raise RuntimeError('insert failed')
+
+        # Connected after stamp_sync_seq, so the bump has happened when this raises
+        pre_save.connect(fail, sender=Income)
+        try:
+            with self.assertRaises(RuntimeError):
+                Income.objects.create(user=user, amount=Decimal('2'), source='Pay', date=date(2024, 1, 2))
+        finally:
+            pre_save.disconnect(fail, sender=Income)
+        self.assertEqual(DataVersion.for_user(user.pk).version, version)
+
+
+class LiveUpdatesTests(TransactionTestCase):
+    def test_wsgi_requests_are_refused(self):
+        user = User.objects.create_user('ivan', password='secret-pass-1')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get('/live/').status_code, 501)
+
+    async def test_stream_pushes_changes_with_month_totals(self):
+        user = await sync_to_async(User.objects.create_user)('ivan', password='secret-pass-1')
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get('/live/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        try:
+            self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+            expense = await sync_to_async(Expense.objects.create)(
+                user=user, amount=Decimal('42'), title='Taxi', date=date(2024, 6, 1),
+            )
+            message = (await asyncio.wait_for(anext(stream), 5)).decode()
+            self.assertTrue(message.startswith('event: change\n'))
+            change = json.loads(message.split('data: ', 1)[1])
+            self.assertEqual(change['id'], expense.pk)
+            self.assertEqual(change['totals']['expenses'], '42.00')
+
+            await sync_to_async(expense.delete)()
+            change = json.loads((await asyncio.wait_for(anext(stream), 5)).decode().split('data: ', 1)[1])
+            self.assertTrue(change['deleted'])
+            self.assertEqual(change['totals']['expenses'], '0.00')
+        finally:
+            await stream.aclose()
+
+
+class CategorySuggestionTests(TestCase):
+    def setUp(self):
+        from .categorizer import clear_models
+
+        clear_models()
+        self.user = User.objects.create_user('jade', password='secret-pass-1')
+        self.food = ExpenseCategory.objects.create(name=ExpenseCategory.EATING_OUT)
+        self.travel = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        for title, category in [('Coffee at Blue Tokai', self.food), ('Pizza dinner', self.food),
+                                ('Uber to airport', self.travel), ('Uber home', self.travel)]:
+            Expense.objects.create(user=self.user, amount=Decimal('10'), title=title, category=category, date=date(2024, 1, 1))
+        self.client.force_login(self.user)
+
+    def suggest(self, title):
+        return self.client.get('/api/suggest-category/', {'title': title}).json()['suggestions']
+
+    def test_suggestions_follow_new_and_deleted_expenses(self):
+        self.assertEqual(self.suggest('uber to office')[0]['name'], 'travel')
+        self.assertEqual(self.suggest('zzz'), [])
+
+        # The cached model catches up with writes instead of retraining
+        paid = Expense.objects.create(user=self.user, amount=Decimal('3'), title='Metro card', category=self.travel, date=date(2024, 1, 2))
+        with self.assertNumQueries(4):  # version check, catch-up (rows, tombstones), category names
+            self.assertEqual(self.suggest('metro')[0]['name'], 'travel')
+        paid.delete()
+        self.assertEqual(self.suggest('metro'), [])
+
+    def test_build_does_not_hold_the_global_lock(self):
+        from . import categorizer
+
+        catch_up = categorizer.CategoryModel.catch_up
+        held = []
+
+        def watched(model, user_id, version):
+            held.append((categorizer._lock.locked(), model.lock.locked()))
+            return catch_up(model, user_id, version)
+
+        with mock.patch.object(categorizer.CategoryModel, 'catch_up', watched):
+            self.suggest('uber')
+        self.assertEqual(held, [(False, True)])
+
+    def test_add_form_falls_back_to_the_suggestion(self):
+        self.client.post('/add-expense/', {'amount': '8', 'title': 'Coffee', 'category': '', 'date': '2024-02-01'})
+        self.assertEqual(Expense.objects.get(amount=Decimal('8')).category, self.food)
+
+    def test_recategorize_command(self):
+        from django.core.management import call_command
+
+        blank = Expense.objects.create(user=self.user, amount=Decimal('4'), title='Uber ride', date=date(2024, 1, 3))
+        unknown = Expense.objects.create(user=self.user, amount=Decimal('4'), title='Something else', date=date(2024, 1, 3))
+        before = blank.sync_seq
+        call_command('recategorize', stdout=io.StringIO())
+        blank.refresh_from_db()
+        unknown.refresh_from_db()
+        self.assertEqual(blank.category, self.travel)
+        self.assertGreater(blank.sync_seq, before)
+        self.assertIsNone(unknown.category)
+
+
+class ExpenseReviewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('kiran', password='secret-pass-1')
+        self.food = ExpenseCategory.objects.create(name=ExpenseCategory.OTHERS)
+        self.client.force_login(self.user)
+
+    def add(self, amount, title='Groceries', day=date(2024, 3, 1)):
+        return Expense.objects.create(user=self.user, amount=Decimal(amount), title=title, category=self.food, date=day)
+
+    def test_duplicates_and_outliers_are_flagged(self):
+        from .models import ExpenseFlag, ExpenseStats
+
+        for i, amount in enumerate(['40', '42', '38', '41', '39', '44', '37', '40']):
+            self.add(amount, title=f'Weekly shop {i}', day=date(2024, 1, 1 + i * 3))
+        self.assertFalse(ExpenseFlag.objects.exists())
+
+        big = self.add('400', title='Weekly shop')
+        first = self.add('25', title='Bakery', day=date(2024, 3, 5))
+        again = self.add('25', title='bakery', day=date(2024, 3, 7))
+        flags = {flag.expense_id: flag for flag in ExpenseFlag.objects.all()}
+        self.assertEqual(set(flags), {big.pk, again.pk})
+        self.assertEqual(flags[big.pk].kind, ExpenseFlag.OUTLIER)
+        self.assertEqual(flags[again.pk].duplicate_of, first)
+
+        # Edits and deletes move the running statistics like a full rebuild would
+        big.amount = Decimal('45')
+        big.save()
+        first.delete()
+        stats = ExpenseStats.objects.get(user=self.user, category=self.food)
+        self.assertEqual(stats.count, 10)
+        from .anomalies import rebuild_stats
+
+        rebuild_stats(self.user.pk)
+        rebuilt = ExpenseStats.objects.get(user=self.user, category=self.food)
+        self.assertAlmostEqual(stats.mean, rebuilt.mean)
+        self.assertAlmostEqual(stats.stdev, rebuilt.stdev)
+
+    def test_review_page_and_dismiss(self):
+        from .models import ExpenseFlag
+
+        self.add('25', title='Bakery')
+        duplicate = self.add('25', title='Bakery')
+        response = self.client.get('/expenses/')
+        self.assertContains(response, 'Review')
+        response = self.client.get('/expenses/review/')
+        self.assertContains(response, 'Possible duplicate')
+        flag = ExpenseFlag.objects.get(expense=duplicate)
+        self.client.post(f'/expenses/review/{flag.pk}/dismiss/')
+        flag.refresh_from_db()
+        self.assertTrue(flag.dismissed)
+        self.assertContains(self.client.get('/expenses/review/'), 'Nothing to review')
+
+    def test_dismiss_invalidates_the_expense_list(self):
+        from .models import ExpenseFlag
+
+        self.add('25', title='Bakery')
+        duplicate = self.add('25', title='Bakery')
+        first = self.client.get('/expenses/')
+        self.assertContains(first, 'Review')
+        flag = ExpenseFlag.objects.get(expense=duplicate)
+        self.client.post(f'/expenses/review/{flag.pk}/dismiss/')
+        self.client.get('/expenses/review/')  # shows and consumes the flash message
+        response = self.client.get('/expenses/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['flagged_count'], 0)
+
+    def test_statistics_follow_recent_spending(self):
+        from .models import ExpenseStats
+
+        with mock.patch.object(ExpenseStats, 'WINDOW', 5):
+            for i in range(20):
+                self.add('100', title=f'Old {i}', day=date(2023, 1, 1))
+            for i in range(20):
+                self.add('10', title=f'New {i}', day=date(2024, 1, 1))
+        stats = ExpenseStats.objects.get(user=self.user, category=self.food)
+        self.assertEqual(stats.count, 5)
+        # The all-time mean would be 55; the rolling one has moved to the new habit
+        self.assertLess(stats.mean, 15)
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', password='secret-pass-1')
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        category = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        for i in range(5):
+            Expense.objects.create(user=self.alice, category=category, amount=Decimal('5'), title=f'Taxi {i}', date=date(2024, 1, 1))
+        Expense.objects.create(user=self.bob, category=category, amount=Decimal('9'), title='Ferry', date=date(2024, 1, 2))
+        self.client.force_login(self.admin)
+
+    def test_user_filter_does_not_list_every_user(self):
+        response = self.client.get('/admin/budgets/expense/')
+        self.assertContains(response, 'js-user-filter')
+        self.assertNotContains(response, f'user__id__exact={self.bob.pk}')
+
+        response = self.client.get(f'/admin/budgets/expense/?user={self.bob.pk}')
+        self.assertContains(response, 'Ferry')
+        self.assertNotContains(response, 'Taxi')
+
+    def test_rows_do_not_query_per_expense(self):
+        self.client.get('/admin/budgets/expense/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/admin/budgets/expense/')
+        Expense.objects.create(user=self.bob, amount=Decimal('1'), title='Bus', date=date(2024, 1, 3))
+        with self.assertNumQueries(len(queries)):
+            self.client.get('/admin/budgets/expense/')
+
+    def test_estimated_count_from_table_statistics(self):
+        from unittest import mock
+
+        from .admin import EstimatedCountPaginator
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        with mock.patch('budgets.admin.ESTIMATE_COUNT_ABOVE', 0):
+            paginator = EstimatedCountPaginator(Expense.objects.all(), 100)
+            with self.assertNumQueries(1):
+                self.assertEqual(paginator.count, 6)
+            # Filtered lists are counted exactly on SQLite
+            self.assertEqual(EstimatedCountPaginator(Expense.objects.filter(user=self.bob), 100).count, 1)
+
+
+class CohortReportTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        self.travel = ExpenseCategory.objects.create(name=ExpenseCategory.TRAVEL)
+        self.food = ExpenseCategory.objects.create(name=ExpenseCategory.EATING_OUT)
+        Income.objects.create(user=self.alice, amount=Decimal('1000'), source='Salary', date=date(2024, 1, 5))
+        Expense.objects.create(user=self.alice, category=self.travel, amount=Decimal('30'), title='Taxi', date=date(2024, 1, 6))
+        Expense.objects.create(user=self.bob, category=self.travel, amount=Decimal('20'), title='Bus', date=date(2024, 1, 7))
+        split = Expense.objects.create(user=self.bob, category=self.food, amount=Decimal('50'), title='Trip', date=date(2024, 2, 1), is_split=True)
+        ExpenseSplit.objects.create(expense=split, category=self.food, amount=Decimal('15'))
+        ExpenseSplit.objects.create(expense=split, category=self.travel, amount=Decimal('35'))
+
+    def totals(self, year, month, label):
+        row = PlatformCategoryMonth.objects.get(year=year, month=month, kind='expense', label=label)
+        return row.total, row.users
+
+    def test_full_and_incremental_runs(self):
+        from .cohorts import run_cohort_job
+
+        run_cohort_job(full=True, workers=1, chunk_users=1)
+        self.assertEqual(self.totals(2024, 1, 'travel'), (Decimal('50.00'), 2))
+        self.assertEqual(self.totals(2024, 2, 'travel'), (Decimal('35.00'), 1))
+        self.assertEqual(PlatformMonth.objects.get(year=2024, month=1).active_users, 2)
+        self.assertFalse(ChangedMonth.objects.exists())
+
+        # Moving an expense queues both months; untouched months are not recomputed
+        taxi = Expense.objects.get(title='Taxi')
+        taxi.date = date(2024, 2, 9)
+        taxi.save()
+        self.assertEqual(set(ChangedMonth.objects.values_list('year', 'month')), {(2024, 1), (2024, 2)})
+        self.assertEqual(run_cohort_job(workers=1, chunk_users=1), (2, 2))
+        self.assertEqual(self.totals(2024, 1, 'travel'), (Decimal('20.00'), 1))
+        self.assertEqual(self.totals(2024, 2, 'travel'), (Decimal('65.00'), 2))
+        self.assertEqual(PlatformMonth.objects.get(year=2024, month=2).active_users, 2)
+        self.assertEqual(run_cohort_job(workers=1), (0, 0))
+
+        self.alice.delete()
+        run_cohort_job(workers=1)
+        self.assertEqual(self.totals(2024, 2, 'travel'), (Decimal('35.00'), 1))
+        self.assertFalse(PlatformCategoryMonth.objects.filter(kind='income').exists())
+
+    def test_signup_month_without_transactions(self):
+        from .cohorts import run_cohort_job
+
+        run_cohort_job(full=True, workers=1)
+        joined = timezone.now().replace(year=2023, month=6, day=15)
+        User.objects.create_user('carol', date_joined=joined)
+        self.assertEqual(list(ChangedMonth.objects.values_list('year', 'month')), [(2023, 6)])
+        run_cohort_job(workers=1)
+        self.assertEqual(PlatformMonth.objects.get(year=2023, month=6).new_users, 1)
+
+        User.objects.get(username='carol').delete()
+        run_cohort_job(workers=1)
+        self.assertFalse(PlatformMonth.objects.filter(year=2023, month=6).exists())
+
+    def test_admin_page(self):
+        admin_user = User.objects.create_superuser('root', password='secret-pass-1')
+        self.client.force_login(admin_user)
+        self.assertContains(self.client.get('/admin/budgets/platformmonth/'), 'Recompute 3 changed months')
+        self.client.post('/admin/budgets/platformmonth/recompute/')
+        response = self.client.get('/admin/budgets/platformmonth/')
+        self.assertContains(response, '2024-02')
+        self.assertContains(response, '-50.0%')
+
+    def test_recompute_needs_its_own_permission(self):
+        from django.contrib.auth.models import Permission
+
+        staff = User.objects.create_user('viewer', password='secret-pass-1', is_staff=True)
+        staff.user_permissions.add(Permission.objects.get(codename='view_platformmonth'))
+        self.client.force_login(staff)
+        self.assertNotContains(self.client.get('/admin/budgets/platformmonth/'), 'Recompute')
+        self.assertEqual(self.client.post('/admin/budgets/platformmonth/recompute/').status_code, 403)
+        self.assertEqual(ChangedMonth.objects.count(), 3)  # the signup month too
+
+        staff.user_permissions.add(Permission.objects.get(codename='recompute_platformmonth'))
+        self.client.post('/admin/budgets/platformmonth/recompute/')
+        self.assertEqual(ChangedMonth.objects.count(), 0)
+
+
+class StartupProfileTests(TestCase):
+    def test_profile_startup_without_reportlab(self):
+        from django.core.management import call_command
+
+        out = io.StringIO()
+        call_command('profile_startup', runs=1, top=10000, entries=['wsgi'], stdout=out)
+        report = out.getvalue()
+        self.assertIn('budget_manager.wsgi', report)
+        self.assertIn('budgets.views.reports', report)
+        # Only the PDF export needs ReportLab, so booting a worker must not import it
+        self.assertNotIn('reportlab', report)
+
+
+class SavingsForecastTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('mira', password='secret-pass-1')
+        MonthlyRollup.objects.create(user=self.user, year=2024, month=1, kind='income', label='', total=Decimal('3000'), count=1)
+        MonthlyRollup.objects.create(user=self.user, year=2024, month=1, kind='expense', label='travel', total=Decimal('1000'), count=3)
+        for month in range(2, 7):
+            Income.objects.create(user=self.user, amount=Decimal('3000'), source='Pay', date=date(2024, month, 1))
+            Expense.objects.create(user=self.user, amount=Decimal('1000'), title='Rent', date=date(2024, month, 2))
+        Expense.objects.create(user=self.user, amount=Decimal('300'), title='Rent', date=date(2024, 7, 2))
+        self.client.force_login(self.user)
+
+    def test_forecast_from_monthly_history(self):
+        from .currency import RateConverter
+        from .forecast import compute_forecast, goal_progress
+
+        converter = RateConverter('INR')
+        forecast = compute_forecast(converter, self.user.pk, date(2024, 7, 10))
+        self.assertEqual(forecast['monthly_savings'], Decimal('2000.00'))
+        self.assertEqual(forecast['income'], Decimal('3000.00'))
+        # 300 so far plus 21 of 31 days at the average 1000 a month
+        self.assertEqual(forecast['expenses'], Decimal('977.42'))
+        self.assertEqual(forecast['history_months'], 6)
+
+        goal = SavingsGoal(user=self.user, name='Car', target_amount=Decimal('10000'), saved_amount=Decimal('2000'),
+                           currency='INR', deadline=date(2024, 12, 31))
+        progress = goal_progress(goal, forecast, converter, date(2024, 7, 10))
+        self.assertEqual(progress['left'], Decimal('8000.00'))
+        self.assertEqual(progress['per_month'], Decimal('1600.00'))
+        self.assertEqual(progress['expected'], date(2024, 11, 1))
+        self.assertTrue(progress['on_track'])
+
+        # A goal centuries away at this rate gets no date instead of overflowing
+        forecast = {**forecast, 'monthly_savings': Decimal('5.00')}
+        goal.target_amount = Decimal('1000000')
+        progress = goal_progress(goal, forecast, converter, date(2024, 7, 10))
+        self.assertIsNone(progress['expected'])
+        self.assertFalse(progress['on_track'])
+
+    def test_dashboard_adds_one_query_once_cached(self):
+        self.client.post('/goals/', {'name': 'Holiday', 'target_amount': '5000', 'deadline': '2030-01-01'})
+        self.client.get('/dashboard/')  # computes and caches the forecast
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/dashboard/')
+        self.assertContains(response, 'Holiday')
+        self.assertEqual(sum('budgets_savingsgoal' in q['sql'] for q in queries), 1)
+        self.assertFalse(any('budgets_monthlyrollup' in q['sql'] for q in queries))
+
+        # New data moves the version, so the next render recomputes
+        saved = response.context['forecast']
+        Income.objects.create(user=self.user, amount=Decimal('900000'), source='Bonus', date=timezone.localdate())
+        self.assertNotEqual(self.client.get('/dashboard/').context['forecast'], saved)
+
+    def test_goal_updates_bump_the_dashboard_etag(self):
+        first = self.client.get('/dashboard/')
+        self.client.post('/goals/', {'name': 'Laptop', 'target_amount': '1500', 'deadline': '2030-06-01'})
+        goal = SavingsGoal.objects.get(name='Laptop')
+        self.client.post(f'/goals/{goal.pk}/update/', {'saved_amount': '500'})
+        goal.refresh_from_db()
+        self.assertEqual(goal.saved_amount, Decimal('500.00'))
+        self.assertEqual(self.client.get('/dashboard/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+        self.client.post(f'/goals/{goal.pk}/delete/')
+        self.assertFalse(SavingsGoal.objects.exists())
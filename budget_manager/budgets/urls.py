@@ -1,24 +1,45 @@
 from django.urls import path
-from . import views
+from .views import api, dashboard, goals, households, reports, transactions
 
 urlpatterns = [
     # Dashboard
-    path('', views.dashboard_view, name='home'),
-    path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('', dashboard.dashboard_view, name='home'),
+    path('dashboard/', dashboard.dashboard_view, name='dashboard'),
     
     # Income & Expenses
-    path('add-income/', views.add_income_view, name='add_income'),
-    path('add-expense/', views.add_expense_view, name='add_expense'),
-    path('expenses/', views.all_expenses_view, name='all_expenses'),
-    path('incomes/', views.all_incomes_view, name='all_incomes'),
+    path('add-income/', transactions.add_income_view, name='add_income'),
+    path('add-expense/', transactions.add_expense_view, name='add_expense'),
+    path('expenses/', transactions.all_expenses_view, name='all_expenses'),
+    path('incomes/', transactions.all_incomes_view, name='all_incomes'),
+    path('expenses/review/', transactions.review_expenses_view, name='review_expenses'),
+    path('expenses/review/<int:flag_id>/dismiss/', transactions.dismiss_flag_view, name='dismiss_flag'),
     
     # Delete operations
-    path('expense/delete/<int:expense_id>/', views.delete_expense_view, name='delete_expense'),
-    path('income/delete/<int:income_id>/', views.delete_income_view, name='delete_income'),
+    path('expense/delete/<int:expense_id>/', transactions.delete_expense_view, name='delete_expense'),
+    path('income/delete/<int:income_id>/', transactions.delete_income_view, name='delete_income'),
     
     # Reports
-    path('yearly-report/', views.yearly_report_view, name='yearly_report'),
-    path('yearly-report/<int:year>/', views.yearly_report_view, name='yearly_report_year'),
-    path('compare-months/', views.compare_months_view, name='compare_months'),
-    path('monthly-report/download/', views.monthly_report_pdf, name='monthly_report_pdf'),
+    path('yearly-report/', reports.yearly_report_view, name='yearly_report'),
+    path('yearly-report/<int:year>/', reports.yearly_report_view, name='yearly_report_year'),
+    path('compare-months/', reports.compare_months_view, name='compare_months'),
+    path('monthly-report/download/', reports.monthly_report_pdf, name='monthly_report_pdf'),
+
+    # Households
+    path('households/', households.households_view, name='households'),
+    path('households/<int:household_id>/', households.household_dashboard_view, name='household_dashboard'),
+    path('households/<int:household_id>/members/add/', households.household_add_member_view, name='household_add_member'),
+    path('households/<int:household_id>/accept/', households.household_accept_view, name='household_accept'),
+    path('households/<int:household_id>/leave/', households.household_leave_view, name='household_leave'),
+    path('households/<int:household_id>/yearly-report/', households.household_yearly_report_view, name='household_yearly_report'),
+    path('households/<int:household_id>/yearly-report/<int:year>/', households.household_yearly_report_view, name='household_yearly_report_year'),
+
+    # Savings goals
+    path('goals/', goals.goals_view, name='goals'),
+    path('goals/<int:goal_id>/update/', goals.goal_update_view, name='goal_update'),
+    path('goals/<int:goal_id>/delete/', goals.goal_delete_view, name='goal_delete'),
+
+    # Delta sync API and live dashboard updates
+    path('api/sync/', api.sync_view, name='sync'),
+    path('live/', api.live_updates_view, name='live_updates'),
+    path('api/suggest-category/', api.suggest_category_view, name='suggest_category'),
 ]
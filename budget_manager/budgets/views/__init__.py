@@ -0,0 +1,5 @@
+"""Views of the budgets app, one module per area (see budgets.urls).
+
+Heavy optional dependencies are imported inside the views that use them
+(ReportLab in reports.monthly_report_pdf), so loading the URLconf stays cheap.
+"""
@@ -0,0 +1,70 @@
+"""JSON and streaming endpoints: delta sync, live updates, category suggestions."""
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods
+
+from budget_manager.db_router import reads_from_replica
+
+from ..categorizer import suggest_categories
+from ..live import event_stream
+from ..models import ExpenseCategory
+from ..sync import MAX_BATCH_SIZE, SYNC_PAGE_SIZE, apply_writes, changes_since
+
+
+@login_required
+@reads_from_replica
+@require_http_methods(['GET', 'POST'])
+def sync_view(request):
+    """Delta sync API: GET changes since a sequence number, POST a batch of writes"""
+    if request.method == 'GET':
+        try:
+            since = int(request.GET.get('since', 0))
+            limit = min(int(request.GET.get('limit', SYNC_PAGE_SIZE)), SYNC_PAGE_SIZE)
+        except ValueError:
+            return JsonResponse({'error': 'since and limit must be integers'}, status=400)
+        full = request.GET.get('full') == '1'
+        return JsonResponse(changes_since(request.user, since, max(limit, 1), full=full))
+
+    try:
+        writes = json.loads(request.body)['writes']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'expected a JSON body with a "writes" list'}, status=400)
+    if not isinstance(writes, list) or not all(isinstance(write, dict) for write in writes):
+        return JsonResponse({'error': '"writes" must be a list of objects'}, status=400)
+    if len(writes) > MAX_BATCH_SIZE:
+        return JsonResponse({'error': f'at most {MAX_BATCH_SIZE} writes per batch'}, status=400)
+    results, seq = apply_writes(request.user, writes)
+    return JsonResponse({'results': results, 'seq': seq})
+
+
+@login_required
+async def live_updates_view(request):
+    """Server-sent events with deltas for the user's open dashboards (ASGI only)"""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the endless stream would tie up a worker thread for good
+        return HttpResponse('Live updates need the ASGI server.', status=501, content_type='text/plain')
+    user = await request.auser()
+    response = StreamingHttpResponse(event_stream(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Ask nginx not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+def suggest_category_view(request):
+    """Category suggestions for an expense title, for the add expense form"""
+    suggestions = suggest_categories(request.user.pk, request.GET.get('title', ''))
+    categories = ExpenseCategory.objects.in_bulk([category_id for category_id, _ in suggestions])
+    return JsonResponse({'suggestions': [
+        {
+            'id': category_id,
+            'name': categories[category_id].name,
+            'label': categories[category_id].get_name_display(),
+            'confidence': round(probability, 3),
+        }
+        for category_id, probability in suggestions if category_id in categories
+    ]})
@@ -0,0 +1,32 @@
+"""Helpers shared by the view modules."""
+from collections import defaultdict
+
+from django.contrib import messages
+
+from accounts.models import Profile
+
+from ..currency import CURRENCY_CHOICES, RateConverter
+
+
+def converter_for(request):
+    """Totals for this request are reported in the user's base currency."""
+    return RateConverter(Profile.base_currency_for(request.user))
+
+
+def warn_missing_rates(request, converter):
+    """Tell the user which amounts the totals left out for lack of an exchange rate."""
+    months = defaultdict(list)
+    for currency, year, month in sorted(converter.missing):
+        months[currency].append(f'{year}-{month:02d}')
+    for currency, labels in months.items():
+        messages.warning(
+            request,
+            f'No {currency} to {converter.base} exchange rate for {", ".join(labels)}; '
+            f'those amounts are left out of the totals.',
+        )
+
+
+def posted_currency(request, converter):
+    currency = request.POST.get('currency')
+    valid = {code for code, _ in CURRENCY_CHOICES}
+    return currency if currency in valid else converter.base
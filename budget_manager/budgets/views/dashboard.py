@@ -0,0 +1,120 @@
+"""The monthly dashboard."""
+from calendar import month_name
+from decimal import Decimal
+
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.utils import timezone
+
+from budget_manager.db_router import reads_from_replica
+
+from ..currency import currency_symbol
+from ..decorators import data_version, user_data_conditional
+from ..forecast import forecast_for, goal_progress
+from ..models import Income, Expense, MonthlyRollup, SavingsGoal, TransactionYear
+from ..reports import ArchivedTotals, as_rows, category_totals, merge_totals
+from .common import converter_for, warn_missing_rates
+
+
+@login_required
+@reads_from_replica
+@user_data_conditional
+def dashboard_view(request):
+    """Main dashboard showing selected month summary. Future months show zeros."""
+    now = timezone.now()
+
+    # Read selected month/year from GET (fall back to current)
+    try:
+        selected_month = int(request.GET.get('month', now.month))
+    except (TypeError, ValueError):
+        selected_month = now.month
+
+    try:
+        selected_year = int(request.GET.get('year', now.year))
+    except (TypeError, ValueError):
+        selected_year = now.year
+
+    converter = converter_for(request)
+
+    # Available years from both incomes and expenses (precomputed index)
+    years_set, archived_years = TransactionYear.index_for(request.user)
+    if not years_set:
+        years_set = [now.year]
+
+    # Determine if selected is in the future
+    is_future = (selected_year > now.year) or (selected_year == now.year and selected_month > now.month)
+
+    if is_future:
+        current_income = Decimal('0.00')
+        current_expenses = Decimal('0.00')
+        remaining = Decimal('0.00')
+        expenses_by_category = []
+        recent_expenses = Expense.objects.none()
+        recent_incomes = Income.objects.none()
+    else:
+        # Query selected month/year (converted to the base currency)
+        current_income = converter.total(Income.objects.filter(
+            user=request.user,
+            date__month=selected_month,
+            date__year=selected_year
+        ))
+
+        month_expenses = Expense.objects.filter(
+            user=request.user,
+            date__month=selected_month,
+            date__year=selected_year
+        )
+        by_category = category_totals(converter, month_expenses)
+        if selected_year in archived_years:
+            archived = ArchivedTotals(converter, request.user, selected_year, selected_month)
+            current_income += archived.total(MonthlyRollup.INCOME)
+            merge_totals(by_category, archived.by_label(MonthlyRollup.EXPENSE))
+        current_expenses = sum(by_category.values(), Decimal('0.00'))
+
+        remaining = current_income - current_expenses
+
+        expenses_by_category = as_rows(by_category)
+
+        recent_expenses = Expense.objects.filter(
+            user=request.user,
+            date__month=selected_month,
+            date__year=selected_year
+        ).select_related('category').order_by('-date', '-id')
+
+        recent_incomes = Income.objects.filter(
+            user=request.user,
+            date__month=selected_month,
+            date__year=selected_year
+        ).order_by('-date')[:5]
+
+    # Forecast for the current month: cached per data version, so only the goals are queried
+    today = timezone.localdate()
+    forecast = forecast_for(converter, request.user.pk, data_version(request).version, today)
+    goals = [
+        goal_progress(goal, forecast, converter, today)
+        for goal in SavingsGoal.objects.filter(user=request.user)[:3]
+    ]
+
+    context = {
+        'current_month': month_name[selected_month],
+        'current_month_num': selected_month,
+        'current_year': selected_year,
+        'selected_month': selected_month,
+        'selected_year': selected_year,
+        'total_income': current_income,
+        'total_expenses': current_expenses,
+        'remaining': remaining,
+        'expenses_by_category': expenses_by_category,
+        'recent_expenses': recent_expenses,
+        'recent_incomes': recent_incomes,
+        # months and years for the report selector
+        'months': [(i, month_name[i]) for i in range(1, 13)],
+        'available_years': years_set,
+        'currency_symbol': currency_symbol(converter.base),
+        'forecast': forecast,
+        'forecast_month': month_name[today.month],
+        'goals': goals,
+    }
+
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/dashboard.html', context)
@@ -0,0 +1,91 @@
+"""Savings goals and their forecast."""
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+
+from ..currency import CURRENCY_CHOICES, currency_symbol
+from ..decorators import data_version
+from ..forecast import forecast_for, goal_progress
+from ..models import DataVersion, SavingsGoal
+from .common import converter_for, posted_currency, warn_missing_rates
+
+
+def _posted_amount(request, name):
+    try:
+        amount = Decimal(request.POST.get(name, '')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+    return amount if amount >= 0 else None
+
+
+@login_required
+def goals_view(request):
+    """List savings goals with their projections and create new ones"""
+    converter = converter_for(request)
+
+    if request.method == 'POST':
+        name = request.POST.get('name', '').strip()
+        target = _posted_amount(request, 'target_amount')
+        saved = _posted_amount(request, 'saved_amount') if request.POST.get('saved_amount') else Decimal('0.00')
+        try:
+            deadline = date.fromisoformat(request.POST.get('deadline', ''))
+        except ValueError:
+            deadline = None
+        if not name or not target or saved is None or deadline is None:
+            messages.error(request, 'Please give the goal a name, a target amount and a deadline.')
+            return redirect('goals')
+        SavingsGoal.objects.create(
+            user=request.user, name=name, target_amount=target, saved_amount=saved,
+            currency=posted_currency(request, converter), deadline=deadline,
+        )
+        # Cached pages and the dashboard ETag follow the data version
+        DataVersion.bump(request.user.pk)
+        messages.success(request, f'Goal "{name}" added!')
+        return redirect('goals')
+
+    today = timezone.localdate()
+    forecast = forecast_for(converter, request.user.pk, data_version(request).version, today)
+    goals = [
+        goal_progress(goal, forecast, converter, today)
+        for goal in SavingsGoal.objects.filter(user=request.user)
+    ]
+    context = {
+        'goals': goals,
+        'forecast': forecast,
+        'currencies': CURRENCY_CHOICES,
+        'base_currency': converter.base,
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/goals.html', context)
+
+
+@login_required
+def goal_update_view(request, goal_id):
+    """Record how much has been put aside for a goal so far"""
+    goal = get_object_or_404(SavingsGoal, id=goal_id, user=request.user)
+    if request.method == 'POST':
+        saved = _posted_amount(request, 'saved_amount')
+        if saved is None:
+            messages.error(request, 'Please enter the amount saved so far.')
+        else:
+            goal.saved_amount = saved
+            goal.save(update_fields=['saved_amount'])
+            DataVersion.bump(request.user.pk)
+            messages.success(request, f'"{goal.name}" updated.')
+    return redirect('goals')
+
+
+@login_required
+def goal_delete_view(request, goal_id):
+    """Delete a savings goal"""
+    goal = get_object_or_404(SavingsGoal, id=goal_id, user=request.user)
+    if request.method == 'POST':
+        goal.delete()
+        DataVersion.bump(request.user.pk)
+        messages.success(request, 'Goal deleted.')
+    return redirect('goals')
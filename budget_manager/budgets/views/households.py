@@ -0,0 +1,249 @@
+"""Shared households and their grouped reports."""
+from calendar import month_name
+from decimal import Decimal
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+
+from accounts.models import Profile
+from budget_manager.db_router import reads_from_replica
+
+from ..currency import CURRENCY_CHOICES, RateConverter, currency_symbol
+from ..models import Income, Expense, Household, HouseholdMembership, MonthlyRollup, TransactionYear
+from ..reports import ArchivedTotals, as_rows, category_totals, merge_totals
+from .common import warn_missing_rates
+
+
+def _household_for(request, household_id):
+    """Household the current user has joined, or 404."""
+    return get_object_or_404(
+        Household, id=household_id,
+        memberships__user=request.user, memberships__accepted_at__isnull=False,
+    )
+
+
+def _member_years(member_ids):
+    """(sorted years with activity of any member, set of years partly archived for some member)."""
+    rows = TransactionYear.objects.filter(user__in=member_ids).values_list('year', 'archived')
+    years, archived = set(), set()
+    for year, is_archived in rows:
+        years.add(year)
+        if is_archived:
+            archived.add(year)
+    return sorted(years), archived
+
+
+def _member_shares(household, by_member, total):
+    """Amount each member paid against an equal share of the total."""
+    members = list(
+        HouseholdMembership.accepted(household=household)
+        .order_by('user__username').values_list('user__username', flat=True)
+    )
+    fair_share = (total / len(members)).quantize(Decimal('0.01')) if members else Decimal('0.00')
+    return [
+        {
+            'username': username,
+            'paid': by_member.get(username, Decimal('0.00')),
+            'balance': by_member.get(username, Decimal('0.00')) - fair_share,
+        }
+        for username in members
+    ], fair_share
+
+
+@login_required
+def households_view(request):
+    """List the user's households and create new ones"""
+    if request.method == 'POST':
+        name = request.POST.get('name', '').strip()
+        if not name:
+            messages.error(request, 'Please give the household a name.')
+            return redirect('households')
+        currency = request.POST.get('currency')
+        if currency not in {code for code, _ in CURRENCY_CHOICES}:
+            currency = Profile.base_currency_for(request.user)
+        household = Household.objects.create(name=name, owner=request.user, base_currency=currency)
+        HouseholdMembership.objects.create(household=household, user=request.user, accepted_at=timezone.now())
+        messages.success(request, f'Household "{name}" created!')
+        return redirect('household_dashboard', household_id=household.id)
+
+    joined = HouseholdMembership.accepted(user=request.user).values('household_id')
+    households = Household.objects.filter(id__in=joined).select_related('owner').annotate(
+        member_count=Count('memberships', filter=Q(memberships__accepted_at__isnull=False))
+    ).order_by('name')
+    invitations = HouseholdMembership.objects.filter(
+        user=request.user, accepted_at__isnull=True
+    ).select_related('household__owner')
+
+    context = {
+        'households': households,
+        'invitations': invitations,
+        'currencies': CURRENCY_CHOICES,
+        'base_currency': Profile.base_currency_for(request.user),
+    }
+    return render(request, 'budgets/households.html', context)
+
+
+@login_required
+def household_add_member_view(request, household_id):
+    """Owner invites an existing user by username; they join once they accept"""
+    household = get_object_or_404(Household, id=household_id, owner=request.user)
+    if request.method == 'POST':
+        username = request.POST.get('username', '').strip()
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            messages.error(request, f'No user named "{username}".')
+        else:
+            membership, created = HouseholdMembership.objects.get_or_create(household=household, user=user)
+            if membership.accepted_at:
+                messages.info(request, f'{user.username} is already in {household.name}.')
+            else:
+                messages.success(request, f'{user.username} was invited to {household.name}.')
+    return redirect('household_dashboard', household_id=household.id)
+
+
+@login_required
+def household_accept_view(request, household_id):
+    """Accept a pending invitation to a household"""
+    membership = get_object_or_404(HouseholdMembership, household_id=household_id, user=request.user)
+    if request.method == 'POST':
+        if membership.accepted_at is None:
+            membership.accepted_at = timezone.now()
+            membership.save(update_fields=['accepted_at'])
+            messages.success(request, f'You joined {membership.household.name}!')
+        return redirect('household_dashboard', household_id=household_id)
+    return redirect('households')
+
+
+@login_required
+def household_leave_view(request, household_id):
+    """Leave a household or decline its invitation; shared expenses stay with the household"""
+    household = get_object_or_404(Household, id=household_id, memberships__user=request.user)
+    if request.method == 'POST':
+        if household.owner_id == request.user.id:
+            messages.error(request, 'The owner cannot leave the household.')
+            return redirect('household_dashboard', household_id=household.id)
+        HouseholdMembership.objects.filter(household=household, user=request.user).delete()
+        messages.success(request, f'You left {household.name}.')
+    return redirect('households')
+
+
+@login_required
+@reads_from_replica
+def household_dashboard_view(request, household_id):
+    """Shared expenses of a household for the selected month, split by category and member"""
+    household = _household_for(request, household_id)
+    now = timezone.now()
+
+    try:
+        selected_month = int(request.GET.get('month', now.month))
+    except (TypeError, ValueError):
+        selected_month = now.month
+
+    try:
+        selected_year = int(request.GET.get('year', now.year))
+    except (TypeError, ValueError):
+        selected_year = now.year
+
+    converter = RateConverter(household.base_currency)
+    # Subquery, so the number of queries does not grow with the number of members
+    member_ids = HouseholdMembership.accepted(household=household).values('user_id')
+
+    shared = Expense.objects.filter(
+        household=household,
+        date__month=selected_month,
+        date__year=selected_year
+    )
+    by_category = category_totals(converter, shared)
+    by_member = converter.totals(shared, 'user__username')
+    total_expenses = sum(by_category.values(), Decimal('0.00'))
+
+    total_income = converter.total(Income.objects.filter(
+        user__in=member_ids,
+        date__month=selected_month,
+        date__year=selected_year
+    ))
+    years, archived_years = _member_years(member_ids)
+    if selected_year in archived_years:
+        archived = ArchivedTotals(converter, member_ids, selected_year, selected_month, kinds=[MonthlyRollup.INCOME])
+        total_income += archived.total(MonthlyRollup.INCOME)
+
+    member_shares, fair_share = _member_shares(household, by_member, total_expenses)
+
+    context = {
+        'household': household,
+        'is_owner': household.owner_id == request.user.id,
+        'pending_members': household.memberships.filter(accepted_at__isnull=True).select_related('user'),
+        'current_month': month_name[selected_month],
+        'selected_month': selected_month,
+        'selected_year': selected_year,
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'remaining': total_income - total_expenses,
+        'expenses_by_category': as_rows(by_category),
+        'member_shares': member_shares,
+        'fair_share': fair_share,
+        'recent_expenses': shared.select_related('category', 'user').order_by('-date', '-id')[:20],
+        'months': [(i, month_name[i]) for i in range(1, 13)],
+        'available_years': years or [now.year],
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/household_dashboard.html', context)
+
+
+@login_required
+@reads_from_replica
+def household_yearly_report_view(request, household_id, year=None):
+    """Yearly report of a household's shared expenses and its members' incomes"""
+    household = _household_for(request, household_id)
+    if year is None:
+        year = timezone.now().year
+
+    converter = RateConverter(household.base_currency)
+    member_ids = HouseholdMembership.accepted(household=household).values('user_id')
+    shared = Expense.objects.filter(household=household, date__year=year)
+
+    income_by_month = converter.totals(
+        Income.objects.filter(user__in=member_ids, date__year=year), 'date__month'
+    )
+    years, archived_years = _member_years(member_ids)
+    if year in archived_years:
+        archived = ArchivedTotals(converter, member_ids, year, kinds=[MonthlyRollup.INCOME])
+        merge_totals(income_by_month, archived.by_month(MonthlyRollup.INCOME))
+    expenses_by_month = converter.totals(shared, 'date__month')
+    by_member = converter.totals(shared, 'user__username')
+    yearly_income = sum(income_by_month.values(), Decimal('0.00'))
+    yearly_expenses = sum(expenses_by_month.values(), Decimal('0.00'))
+    member_shares, fair_share = _member_shares(household, by_member, yearly_expenses)
+
+    monthly_data = []
+    for month in range(1, 13):
+        month_income = income_by_month.get(month, Decimal('0.00'))
+        month_expenses = expenses_by_month.get(month, Decimal('0.00'))
+        monthly_data.append({
+            'month': month_name[month],
+            'month_num': month,
+            'income': month_income,
+            'expenses': month_expenses,
+            'balance': month_income - month_expenses
+        })
+
+    context = {
+        'household': household,
+        'year': year,
+        'yearly_income': yearly_income,
+        'yearly_expenses': yearly_expenses,
+        'yearly_balance': yearly_income - yearly_expenses,
+        'expenses_by_category': as_rows(category_totals(converter, shared)),
+        'member_shares': member_shares,
+        'fair_share': fair_share,
+        'monthly_data': monthly_data,
+        'available_years': years or [timezone.now().year],
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/household_yearly_report.html', context)
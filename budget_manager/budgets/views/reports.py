@@ -0,0 +1,305 @@
+"""Month comparison, yearly report and the monthly PDF export."""
+from calendar import month_name
+from decimal import Decimal
+import io
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from budget_manager.db_router import reads_from_replica
+
+from ..currency import currency_symbol
+from ..decorators import user_data_conditional
+from ..models import Income, Expense, ExpenseCategory, MonthlyRollup, TransactionYear
+from ..reports import ArchivedTotals, as_rows, category_totals, merge_totals, tag_totals
+from .common import converter_for, warn_missing_rates
+
+
+@login_required
+@reads_from_replica
+@user_data_conditional
+def monthly_report_pdf(request):
+    """Generate a PDF monthly report for the selected month/year and return as attachment."""
+    # ReportLab takes ~100 ms to import; only this view needs it, so workers don't load it at boot
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    # Accept month and year via GET parameters
+    try:
+        month = int(request.GET.get('month', timezone.now().month))
+    except (TypeError, ValueError):
+        month = timezone.now().month
+
+    try:
+        year = int(request.GET.get('year', timezone.now().year))
+    except (TypeError, ValueError):
+        year = timezone.now().year
+
+    # Query data
+    incomes = Income.objects.filter(user=request.user, date__month=month, date__year=year).order_by('-date')
+    expenses = Expense.objects.filter(user=request.user, date__month=month, date__year=year).select_related('category').order_by('-date')
+
+    converter = converter_for(request)
+    symbol = currency_symbol(converter.base)
+    total_income = converter.total(incomes)
+    total_expenses = converter.total(expenses)
+    # Archived months only keep their rollups, so they show as one line per table
+    archived_income = archived_expenses = Decimal('0.00')
+    if year in TransactionYear.index_for(request.user)[1]:
+        archived = ArchivedTotals(converter, request.user, year, month)
+        archived_income = archived.total(MonthlyRollup.INCOME)
+        archived_expenses = archived.total(MonthlyRollup.EXPENSE)
+    total_income += archived_income
+    total_expenses += archived_expenses
+    balance = total_income - total_expenses
+
+    # Create PDF using ReportLab Platypus for clean tables
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=2*cm, rightMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Title
+    title = Paragraph(f"Monthly Report - {month_name[month]} {year}", styles['Title'])
+    story.append(title)
+    story.append(Spacer(1, 12))
+
+    # Summary table
+    summary_data = [
+        ['User', request.user.username],
+        ['Total Income', f'{symbol}{total_income:,.2f}'],
+        ['Total Expenses', f'{symbol}{total_expenses:,.2f}'],
+        ['Balance', f'{symbol}{balance:,.2f}'],
+    ]
+    if converter.missing:
+        currencies = ', '.join(sorted({currency for currency, _, _ in converter.missing}))
+        summary_data.append(['Note', f'No exchange rate for {currencies}; left out of the totals'])
+    summary_table = Table(summary_data, colWidths=[4*cm, 10*cm])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    story.append(summary_table)
+    story.append(Spacer(1, 12))
+
+    # Incomes table
+    story.append(Paragraph('Incomes', styles['Heading3']))
+    inc_table_data = [['Date', 'Source', 'Amount']]
+    for inc in incomes:
+        inc_table_data.append([inc.date.strftime('%d %b %Y'), inc.source or '', f'{inc.currency_symbol}{inc.amount:,.2f}'])
+    if archived_income:
+        inc_table_data.append(['-', 'Archived incomes', f'{symbol}{archived_income:,.2f}'])
+    if len(inc_table_data) == 1:
+        inc_table_data.append(['-', 'No incomes for this month.', '-'])
+
+    inc_table = Table(inc_table_data, colWidths=[3*cm, 8*cm, 3*cm])
+    inc_table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+        ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    story.append(inc_table)
+    story.append(Spacer(1, 12))
+
+    # Expenses table
+    story.append(Paragraph('Expenses', styles['Heading3']))
+    exp_table_data = [['Date', 'Category / Title', 'Amount']]
+    for exp in expenses:
+        cat = exp.category.name if getattr(exp, 'category', None) else exp.title
+        exp_table_data.append([exp.date.strftime('%d %b %Y'), cat, f'{exp.currency_symbol}{exp.amount:,.2f}'])
+    if archived_expenses:
+        exp_table_data.append(['-', 'Archived expenses', f'{symbol}{archived_expenses:,.2f}'])
+    if len(exp_table_data) == 1:
+        exp_table_data.append(['-', 'No expenses for this month.', '-'])
+
+    exp_table = Table(exp_table_data, colWidths=[3*cm, 8*cm, 3*cm])
+    exp_table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightcoral),
+        ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    story.append(exp_table)
+
+    # Build PDF
+    doc.build(story)
+
+    buffer.seek(0)
+    filename = f"monthly_report_{year}_{month}.pdf"
+    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@reads_from_replica
+@user_data_conditional
+def compare_months_view(request):
+    """Compare current month with last month - Shows Last Month List"""
+    now = timezone.now()
+    current_month = now.month
+    current_year = now.year
+    
+    # Calculate last month
+    if current_month == 1:
+        last_month = 12
+        last_year = current_year - 1
+    else:
+        last_month = current_month - 1
+        last_year = current_year
+    
+    converter = converter_for(request)
+
+    # Current month data (converted to the base currency)
+    current_income = converter.total(Income.objects.filter(
+        user=request.user,
+        date__month=current_month,
+        date__year=current_year
+    ))
+    
+    current_by_category = category_totals(converter, Expense.objects.filter(
+        user=request.user,
+        date__month=current_month,
+        date__year=current_year
+    ))
+    current_expenses = sum(current_by_category.values(), Decimal('0.00'))
+    
+    # Last month data
+    last_income = converter.total(Income.objects.filter(
+        user=request.user,
+        date__month=last_month,
+        date__year=last_year
+    ))
+    
+    last_by_category = category_totals(converter, Expense.objects.filter(
+        user=request.user,
+        date__month=last_month,
+        date__year=last_year
+    ))
+    last_expenses = sum(last_by_category.values(), Decimal('0.00'))
+    
+    # Get all last month expenses for the list
+    last_month_expenses = Expense.objects.filter(
+        user=request.user,
+        date__month=last_month,
+        date__year=last_year
+    ).select_related('category').order_by('-date')
+    
+    # Create category comparison
+    categories = ExpenseCategory.objects.all()
+    category_comparison = []
+    
+    for category in categories:
+        current_cat_expense = current_by_category.get(category.name, Decimal('0.00'))
+        last_cat_expense = last_by_category.get(category.name, Decimal('0.00'))
+        
+        difference = current_cat_expense - last_cat_expense
+        if last_cat_expense > 0:
+            percentage_change = (difference / last_cat_expense) * 100
+        else:
+            percentage_change = 100 if current_cat_expense > 0 else 0
+        
+        category_comparison.append({
+            'category': category.get_name_display(),
+            'current': current_cat_expense,
+            'last': last_cat_expense,
+            'difference': difference,
+            'percentage_change': percentage_change
+        })
+    
+    context = {
+        'current_month': month_name[current_month],
+        'current_year': current_year,
+        'last_month': month_name[last_month],
+        'last_year': last_year,
+        'current_income': current_income,
+        'current_expenses': current_expenses,
+        'current_balance': current_income - current_expenses,
+        'last_income': last_income,
+        'last_expenses': last_expenses,
+        'last_balance': last_income - last_expenses,
+        'category_comparison': category_comparison,
+        'last_month_expenses': last_month_expenses,  # For the list
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/compare_months.html', context)
+
+
+@login_required
+@reads_from_replica
+@user_data_conditional
+def yearly_report_view(request, year=None):
+    """View yearly expenses report"""
+    if year is None:
+        year = timezone.now().year
+    
+    converter = converter_for(request)
+    year_incomes = Income.objects.filter(user=request.user, date__year=year)
+    year_expenses = Expense.objects.filter(user=request.user, date__year=year)
+
+    # Monthly totals in the base currency: one grouped query per table
+    income_by_month = converter.totals(year_incomes, 'date__month')
+    expenses_by_month = converter.totals(year_expenses, 'date__month')
+    by_category = category_totals(converter, year_expenses)
+    by_tag = tag_totals(converter, request.user, year)
+
+    # Archived months are read from their rollups, only for years that have them
+    years_list, archived_years = TransactionYear.index_for(request.user)
+    if year in archived_years:
+        archived = ArchivedTotals(converter, request.user, year)
+        merge_totals(income_by_month, archived.by_month(MonthlyRollup.INCOME))
+        merge_totals(expenses_by_month, archived.by_month(MonthlyRollup.EXPENSE))
+        merge_totals(by_category, archived.by_label(MonthlyRollup.EXPENSE))
+        merge_totals(by_tag, archived.by_label(MonthlyRollup.TAG))
+
+    yearly_income = sum(income_by_month.values(), Decimal('0.00'))
+    yearly_expenses = sum(expenses_by_month.values(), Decimal('0.00'))
+    
+    # Get expenses by category (split expenses count by their lines) and by tag
+    expenses_by_category = as_rows(by_category)
+    expenses_by_tag = as_rows(by_tag, key='tag__name')
+    
+    # Get monthly breakdown
+    monthly_data = []
+    for month in range(1, 13):
+        month_income = income_by_month.get(month, Decimal('0.00'))
+        month_expenses = expenses_by_month.get(month, Decimal('0.00'))
+        
+        monthly_data.append({
+            'month': month_name[month],
+            'month_num': month,
+            'income': month_income,
+            'expenses': month_expenses,
+            'balance': month_income - month_expenses
+        })
+    
+    # Available years for dropdown (incomes and expenses, same as the dashboard)
+    if not years_list:
+        years_list = [timezone.now().year]
+    
+    context = {
+        'year': year,
+        'yearly_income': yearly_income,
+        'yearly_expenses': yearly_expenses,
+        'yearly_balance': yearly_income - yearly_expenses,
+        'expenses_by_category': expenses_by_category,
+        'expenses_by_tag': expenses_by_tag,
+        'monthly_data': monthly_data,
+        'available_years': years_list,
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/yearly_report.html', context)
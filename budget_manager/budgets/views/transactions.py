@@ -0,0 +1,287 @@
+"""Adding, listing, reviewing and deleting incomes and expenses."""
+from calendar import month_name
+from decimal import Decimal, InvalidOperation
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+
+from budget_manager.db_router import reads_from_replica
+
+from ..categorizer import suggest_categories
+from ..currency import CURRENCY_CHOICES, currency_symbol
+from ..decorators import user_data_conditional
+from ..models import (
+    DataVersion, Income, Expense, ExpenseCategory, ExpenseFlag, ExpenseSplit, ExpenseTag, Household,
+    HouseholdMembership, MonthlyRollup, Tag,
+)
+from ..reports import archived_total
+from .common import converter_for, posted_currency, warn_missing_rates
+
+
+@login_required
+def add_income_view(request):
+    """Add new income"""
+    converter = converter_for(request)
+
+    if request.method == 'POST':
+        amount = request.POST.get('amount')
+        source = request.POST.get('source')
+        description = request.POST.get('description', '')
+        date = request.POST.get('date')
+        
+        Income.objects.create(
+            user=request.user,
+            amount=Decimal(amount),
+            currency=posted_currency(request, converter),
+            source=source,
+            description=description,
+            date=date or timezone.now()
+        )
+        messages.success(request, 'Income added successfully!')
+        return redirect('dashboard')
+    
+    # Get context for the page
+    now = timezone.now()
+    
+    # Get current month data for summary card
+    total_income = converter.total(Income.objects.filter(
+        user=request.user,
+        date__month=now.month,
+        date__year=now.year
+    ))
+    
+    total_expenses = converter.total(Expense.objects.filter(
+        user=request.user,
+        date__month=now.month,
+        date__year=now.year
+    ))
+    
+    recent_incomes = Income.objects.filter(user=request.user)[:5]
+    
+    context = {
+        'current_month': month_name[now.month],
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'remaining': total_income - total_expenses,
+        'recent_incomes': recent_incomes,
+        'currencies': CURRENCY_CHOICES,
+        'base_currency': converter.base,
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    
+    return render(request, 'budgets/add_income.html', context)
+
+
+def _posted_splits(request):
+    """(category, amount) lines from the split rows of the add expense form.
+
+    A malformed row raises ValueError or InvalidOperation.
+    """
+    categories = ExpenseCategory.objects.in_bulk()
+    splits = []
+    for category_id, amount in zip(request.POST.getlist('split_category'),
+                                   request.POST.getlist('split_amount')):
+        if not category_id or not amount:
+            continue
+        category = categories.get(int(category_id))
+        if category is None:
+            continue
+        splits.append((category, Decimal(amount)))
+    return splits
+
+
+def _tag_expense(expense, tag_names):
+    """Attach comma separated tags to an expense, creating missing ones in bulk"""
+    names = {}
+    for name in tag_names.split(','):
+        name = name.strip()[:50]
+        if name:
+            names.setdefault(name.lower(), name)
+    if not names:
+        return
+    existing = {tag.name.lower(): tag for tag in Tag.objects.filter(user=expense.user)}
+    missing = [Tag(user=expense.user, name=name) for key, name in names.items() if key not in existing]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = {tag.name.lower(): tag for tag in Tag.objects.filter(user=expense.user)}
+    ExpenseTag.objects.bulk_create(
+        [ExpenseTag(expense=expense, tag=existing[key]) for key in names if key in existing],
+        ignore_conflicts=True,
+    )
+
+
+@login_required
+def add_expense_view(request):
+    """Add new expense"""
+    categories = ExpenseCategory.objects.all()
+    converter = converter_for(request)
+    
+    if request.method == 'POST':
+        amount = request.POST.get('amount')
+        title = request.POST.get('title')
+        category_id = request.POST.get('category')
+        description = request.POST.get('description', '')
+        date = request.POST.get('date')
+        
+        if not category_id:
+            # No category picked: take the suggestion from the title, if there is one
+            suggestions = suggest_categories(request.user.pk, title, limit=1)
+            if not suggestions:
+                messages.error(request, 'Please choose a category.')
+                return redirect('add_expense')
+            category_id = suggestions[0][0]
+        category = get_object_or_404(ExpenseCategory, id=category_id)
+        household_id = request.POST.get('household')
+        household = None
+        if household_id:
+            household = get_object_or_404(
+                Household, id=household_id,
+                memberships__user=request.user, memberships__accepted_at__isnull=False,
+            )
+        
+        amount = Decimal(amount)
+        try:
+            splits = _posted_splits(request)
+        except (ValueError, InvalidOperation):
+            messages.error(request, 'Each split line needs a category and a valid amount.')
+            return redirect('add_expense')
+        if splits:
+            if sum(line_amount for _, line_amount in splits) != amount:
+                messages.error(request, 'Split amounts must add up to the expense amount.')
+                return redirect('add_expense')
+            # The largest line stands in for the expense in plain lists
+            category = max(splits, key=lambda line: line[1])[0]
+        
+        with transaction.atomic():
+            expense = Expense.objects.create(
+                user=request.user,
+                amount=amount,
+                currency=posted_currency(request, converter),
+                title=title,
+                category=category,
+                household=household,
+                is_split=bool(splits),
+                description=description,
+                date=date or timezone.now()
+            )
+            if splits:
+                ExpenseSplit.objects.bulk_create(
+                    ExpenseSplit(expense=expense, category=line_category, amount=line_amount)
+                    for line_category, line_amount in splits
+                )
+            _tag_expense(expense, request.POST.get('tags', ''))
+        messages.success(request, 'Expense added successfully!')
+        return redirect('dashboard')
+    
+    # Get recent expenses for sidebar
+    recent_expenses = Expense.objects.filter(user=request.user).select_related('category')[:5]
+    
+    now = timezone.now()
+    
+    context = {
+        'categories': categories,
+        'recent_expenses': recent_expenses,
+        'current_month': month_name[now.month],
+        'currencies': CURRENCY_CHOICES,
+        'base_currency': converter.base,
+        'households': Household.objects.filter(
+            id__in=HouseholdMembership.accepted(user=request.user).values('household_id')
+        ),
+        'tags': Tag.objects.filter(user=request.user),
+    }
+    
+    return render(request, 'budgets/add_expense.html', context)
+
+
+@login_required
+@reads_from_replica
+@user_data_conditional
+def all_expenses_view(request):
+    """View all expenses"""
+    expenses = Expense.objects.filter(user=request.user).select_related('category').prefetch_related('tags')
+    
+    # Get total
+    converter = converter_for(request)
+    archived = archived_total(converter, request.user, MonthlyRollup.EXPENSE)
+    total_expenses = converter.total(expenses) + archived
+    
+    context = {
+        'expenses': expenses,
+        'total_expenses': total_expenses,
+        'archived_total': archived,
+        'flagged_count': ExpenseFlag.objects.filter(user=request.user, dismissed=False).count(),
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/all_expenses.html', context)
+
+
+@login_required
+@reads_from_replica
+@user_data_conditional
+def all_incomes_view(request):
+    """View all incomes"""
+    # Show newest incomes first
+    incomes = Income.objects.filter(user=request.user).order_by('-date', '-id')
+    
+    # Get total
+    converter = converter_for(request)
+    archived = archived_total(converter, request.user, MonthlyRollup.INCOME)
+    total_incomes = converter.total(incomes) + archived
+    
+    context = {
+        'incomes': incomes,
+        'total_incomes': total_incomes,
+        'archived_total': archived,
+        'currency_symbol': currency_symbol(converter.base),
+    }
+    
+    warn_missing_rates(request, converter)
+    return render(request, 'budgets/all_incomes.html', context)
+
+
+@login_required
+def review_expenses_view(request):
+    """Possible duplicates and unusual amounts waiting for review"""
+    flags = ExpenseFlag.objects.filter(user=request.user, dismissed=False).select_related(
+        'expense__category', 'duplicate_of'
+    )
+    return render(request, 'budgets/review_expenses.html', {'flags': flags})
+
+
+@login_required
+def dismiss_flag_view(request, flag_id):
+    """Mark a flagged expense as fine"""
+    flag = get_object_or_404(ExpenseFlag, id=flag_id, user=request.user)
+    if request.method == 'POST':
+        with transaction.atomic():
+            flag.dismissed = True
+            flag.save(update_fields=['dismissed'])
+            # The expense list shows the open flag count, so its ETag must move
+            DataVersion.bump(request.user.pk)
+        messages.success(request, 'Expense marked as reviewed.')
+    return redirect('review_expenses')
+
+
+@login_required
+def delete_expense_view(request, expense_id):
+    """Delete an expense"""
+    expense = get_object_or_404(Expense, id=expense_id, user=request.user)
+    if request.method == 'POST':
+        expense.delete()
+        messages.success(request, 'Expense deleted successfully!')
+    return redirect('all_expenses')
+
+
+@login_required
+def delete_income_view(request, income_id):
+    """Delete an income"""
+    income = get_object_or_404(Income, id=income_id, user=request.user)
+    if request.method == 'POST':
+        income.delete()
+        messages.success(request, 'Income deleted successfully!')
+    return redirect('all_incomes')
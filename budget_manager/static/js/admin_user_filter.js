@@ -0,0 +1,7 @@
+'use strict';
+// Reload the changelist when a user is picked in budgets.admin.UserFilter
+django.jQuery(document).on('change', '.js-user-filter', function() {
+    const base = this.dataset.queryString;
+    const joiner = base.length > 1 ? '&' : '';
+    window.location.search = this.value ? base + joiner + 'user=' + encodeURIComponent(this.value) : base;
+});
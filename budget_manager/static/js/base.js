@@ -0,0 +1,78 @@
+// Add stagger animation to elements
+document.addEventListener('DOMContentLoaded', function() {
+    const elements = document.querySelectorAll('.card, .stat-card');
+    elements.forEach((el, index) => {
+        el.style.animationDelay = `${index * 0.1}s`;
+        el.classList.add('fade-in');
+    });
+});
+
+// Auto dismiss alerts
+setTimeout(function() {
+    const alerts = document.querySelectorAll('.alert');
+    alerts.forEach(alert => {
+        const bsAlert = new bootstrap.Alert(alert);
+        bsAlert.close();
+    });
+}, 5000);
+
+// Global delete modal handler
+document.addEventListener('DOMContentLoaded', function () {
+    const deleteModalEl = document.getElementById('confirmDeleteModal');
+    if (!deleteModalEl) return;
+    const deleteModal = new bootstrap.Modal(deleteModalEl);
+    let targetHref = null;
+
+    document.body.addEventListener('click', function (e) {
+        const btn = e.target.closest('.js-delete-link');
+        if (!btn) return;
+        e.preventDefault();
+        // Read attributes
+        const title = btn.getAttribute('data-title') || '';
+        const amount = btn.getAttribute('data-amount') || '';
+        targetHref = btn.getAttribute('href');
+
+        const msgEl = document.getElementById('confirmDeleteMessage');
+        let message = 'Are you sure you want to delete this item?';
+        if (title && amount) {
+            message = `Are you sure you want to delete "${title}" (${amount})?`;
+        } else if (title) {
+            message = `Are you sure you want to delete "${title}"?`;
+        }
+        msgEl.textContent = message;
+        deleteModal.show();
+    });
+
+    document.getElementById('confirmDeleteBtn').addEventListener('click', function () {
+        if (!targetHref) return;
+        // Deletes are POST-only, so the write keeps the user's next reads off the replica
+        const form = document.getElementById('confirmDeleteForm');
+        form.action = targetHref;
+        form.submit();
+    });
+});
+
+// Global logout modal handler
+document.addEventListener('DOMContentLoaded', function () {
+        const logoutModalEl = document.getElementById('confirmLogoutModal');
+        if (!logoutModalEl) return;
+        const logoutModal = new bootstrap.Modal(logoutModalEl);
+        let logoutHref = null;
+
+        document.body.addEventListener('click', function (e) {
+                const btn = e.target.closest('.js-logout-link');
+                if (!btn) return;
+                e.preventDefault();
+                logoutHref = btn.getAttribute('href');
+                const msgEl = document.getElementById('confirmLogoutMessage');
+                // Optionally customize message
+                msgEl.textContent = 'Are you sure you want to log out?';
+                logoutModal.show();
+        });
+
+        document.getElementById('confirmLogoutBtn').addEventListener('click', function () {
+                if (!logoutHref) return;
+                // Navigate to logout URL
+                window.location.href = logoutHref;
+        });
+});